@@ -0,0 +1,117 @@
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+DOCUMENTATION = '''
+---
+author: Tatsuya Naganawa (@tnaganawa)
+httpapi: tungstenfabric
+short_description: HttpApi plugin for tungstenfabric controller
+description:
+    - "keep keystone token, webui session (cookie and csrf token) and pooled http connections
+      in the persistent ansible-connection process, so that tungstenfabric.networking modules
+      don't need to login again for each task"
+version_added: "2.10"
+'''
+
+import os
+import json
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    from ansible_collections.ansible.netcommon.plugins.plugin_utils.httpapi_base import HttpApiBase
+except ImportError:
+    from ansible.plugins.httpapi import HttpApiBase
+
+HTTP_TIMEOUT = int(os.getenv('TF_HTTP_TIMEOUT', '60'))
+
+
+class HttpApi(HttpApiBase):
+    def __init__(self, connection):
+        super(HttpApi, self).__init__(connection)
+        self._session = None
+        # (auth url, keystone request body) -> token
+        self._keystone_tokens = {}
+        # webui url -> (username, password, csrf token)
+        self._web_logins = {}
+
+    def _get_session(self):
+        if self._session == None:
+            self._session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+            self._session.mount('http://', adapter)
+            self._session.mount('https://', adapter)
+        return self._session
+
+    def login(self, username, password):
+        # keystone and webui credentials are sent by each module, so nothing to do here
+        pass
+
+    def logout(self):
+        if not self._session == None:
+            self._session.close()
+        self._session = None
+        self._keystone_tokens = {}
+        self._web_logins = {}
+
+    def get_keystone_token(self, url, data, force=False):
+        key = (url, data)
+        if not force and key in self._keystone_tokens:
+            return self._keystone_tokens[key]
+
+        response = self._get_session().post(url, data=data, headers={"Content-Type": "application/json", "charset": "UTF-8"}, timeout=HTTP_TIMEOUT)
+        if not (response.status_code == 200 or response.status_code == 201):
+            return None
+        token = response.headers.get("X-Subject-Token")
+        self._keystone_tokens[key] = token
+        return token
+
+    def web_login(self, url, username, password, force=False):
+        login = self._web_logins.get(url)
+        if not force and login and login[0] == username:
+            return login[2]
+
+        session = self._get_session()
+        response = session.post(url + 'authenticate', data=json.dumps({"username": username, "password": password}), headers={"Content-Type": "application/json", "charset": "UTF-8"}, verify=False, timeout=HTTP_TIMEOUT)
+        csrftoken = session.cookies.get('_csrf')
+        if csrftoken == None:
+            return None
+        self._web_logins[url] = (username, password, csrftoken)
+        return csrftoken
+
+    def _refresh_auth(self, url, headers):
+        ## keystone token expired: get a new one and replace the header
+        token = headers.get("x-auth-token")
+        if token:
+            for key in list(self._keystone_tokens):
+                if self._keystone_tokens[key] == token:
+                    new_token = self.get_keystone_token(key[0], key[1], force=True)
+                    if new_token:
+                        headers["x-auth-token"] = new_token
+                        return True
+        ## webui session expired: login again and replace csrf token
+        for web_url in list(self._web_logins):
+            if url.startswith(web_url):
+                username, password, csrftoken = self._web_logins[web_url]
+                new_csrftoken = self.web_login(web_url, username, password, force=True)
+                if new_csrftoken:
+                    headers["x-csrf-token"] = new_csrftoken
+                    return True
+        return False
+
+    def send_request(self, data, url, method='GET', headers=None):
+        headers = dict(headers or {})
+        session = self._get_session()
+
+        ## csrf token which module has might be older than the one in this session
+        if "x-csrf-token" in headers:
+            for web_url in self._web_logins:
+                if url.startswith(web_url):
+                    headers["x-csrf-token"] = self._web_logins[web_url][2]
+
+        response = session.request(method, url, data=data, headers=headers, verify=False, timeout=HTTP_TIMEOUT)
+        if response.status_code == 401 and self._refresh_auth(url, headers):
+            response = session.request(method, url, data=data, headers=headers, verify=False, timeout=HTTP_TIMEOUT)
+
+        return {"status_code": response.status_code, "text": response.text, "headers": dict(response.headers)}
@@ -0,0 +1,120 @@
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+DOCUMENTATION = '''
+---
+author: Tatsuya Naganawa (@tnaganawa)
+lookup: tf_uuid
+short_description: get uuids of tungstenfabric objects from their fq_names
+description:
+    - "resolve many fq_names of one type to uuids, with a few requests to config-api (list-bulk-collection)"
+    - "results are cached in the ansible controller, so the same fq_name is not requested again in the play"
+    - "keystone token is obtained from OS_AUTH_URL etc, same with the modules"
+version_added: "2.10"
+options:
+    _terms:
+        description:
+            - fq_names, as colon separated string (default-domain:admin:vn1) or list
+        required: True
+    type:
+        description:
+            - type of the objects, such as virtual-network, virtual-machine-interface, loadbalancer-pool
+        required: True
+    controller_ip:
+        description:
+            - tungstenfabric controller ip (comma separated list, when there are multiple controllers)
+            - required unless snapshot is used
+        env:
+            - name: TF_CONTROLLER_IP
+        vars:
+            - name: tf_controller_ip
+    snapshot:
+        description:
+            - path of the snapshot which tf_snapshot module wrote. when this is set, fq_names are resolved from it, without asking config-api
+        env:
+            - name: TF_SNAPSHOT
+    ignore_missing:
+        description:
+            - return None for fq_names which don't exist, instead of failing
+        type: bool
+        default: False
+    cache_ttl:
+        description:
+            - seconds to keep fq_name / uuid pairs on disk ($TF_CACHE_DIR/fqname.db), which are shared by forks and later tasks. 0 to disable.
+            - modules update those pairs when objects are created or deleted, whenever this file exists
+        type: int
+        default: 600
+        env:
+            - name: TF_FQNAME_CACHE_TTL
+'''
+
+EXAMPLES = '''
+- name: get subnet uuid for loadbalancer
+  set_fact:
+    vn1_uuid: "{{ lookup('tungstenfabric.networking.tf_uuid', 'default-domain:admin:vn1', type='virtual-network', controller_ip=controller_ip) }}"
+
+- name: get uuid from the snapshot which tf_snapshot module wrote
+  set_fact:
+    vn1_uuid: "{{ lookup('tungstenfabric.networking.tf_uuid', 'default-domain:admin:vn1', type='virtual-network', snapshot='/tmp/tf-snapshot.db') }}"
+
+- name: get uuids of many vmis at once
+  set_fact:
+    left_interface_uuids: "{{ query('tungstenfabric.networking.tf_uuid', *left_vmi_fqnames, type='virtual-machine-interface', controller_ip=controller_ip) }}"
+'''
+
+RETURN = '''
+_list:
+    description:
+        - uuids, in the same order with fq_names
+    type: list
+'''
+
+import os
+
+from ansible.errors import AnsibleError
+from ansible.module_utils.six import string_types
+from ansible.plugins.lookup import LookupBase
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import TFClient, TFError
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.snapshot import Snapshot
+
+# (controller_ip, cache_ttl) -> TFClient, kept while this process is alive
+_clients = {}
+
+
+class LookupModule(LookupBase):
+    def _get_client(self, controller_ip, cache_ttl):
+        key = (controller_ip, cache_ttl)
+        if not key in _clients:
+            client = TFClient(None, controller_ip, fqname_cache_ttl=cache_ttl)
+            client.keystone_login()
+            _clients[key] = client
+        return _clients[key]
+
+    def run(self, terms, variables=None, **kwargs):
+        self.set_options(var_options=variables, direct=kwargs)
+        obj_type = self.get_option('type')
+        controller_ip = self.get_option('controller_ip')
+        ignore_missing = self.get_option('ignore_missing')
+        cache_ttl = self.get_option('cache_ttl')
+        snapshot_path = self.get_option('snapshot')
+
+        if snapshot_path:
+            try:
+                snapshot = Snapshot(os.path.expanduser(snapshot_path))
+            except (IOError, OSError) as e:
+                raise AnsibleError("tf_uuid lookup failed: {}".format(e))
+            uuids = [snapshot.resolve(obj_type.replace('_', '-'), term.split(":") if isinstance(term, string_types) else term) for term in terms]
+            snapshot.close()
+        else:
+            if not controller_ip:
+                raise AnsibleError("tf_uuid lookup needs controller_ip or snapshot")
+            try:
+                client = self._get_client(controller_ip, cache_ttl)
+                uuids = client.resolve_many(obj_type, terms)
+            except TFError as e:
+                raise AnsibleError("tf_uuid lookup failed: {}".format(e.msg))
+
+        missing = [term for term, uuid in zip(terms, uuids) if uuid == None]
+        if missing and not ignore_missing:
+            raise AnsibleError("{} specified doesn't exist: {}".format(obj_type, ", ".join([term if isinstance(term, string_types) else ":".join(term) for term in missing])))
+        return uuids
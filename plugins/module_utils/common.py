@@ -6,132 +6,1595 @@
 import sys
 import os
 import json
-import requests
+import time
+import calendar
+import fcntl
+import atexit
+import random
+import socket
+import errno
+import threading
+import re
+import copy
+from email.utils import parsedate
+from ansible.module_utils._text import to_text
+from ansible.module_utils.connection import Connection, ConnectionError
+from ansible.module_utils.six import string_types
+from ansible.module_utils.six.moves import http_cookiejar
+from ansible.module_utils.six.moves.urllib.error import HTTPError
+from ansible.module_utils.urls import Request
 
-# begin: variables: cannot be directly accessed, but can be accessed by get method
+try:
+  import sqlite3
+  HAS_SQLITE3 = True
+except ImportError:
+  HAS_SQLITE3 = False
+
+# default headers: each TFClient has its own copy
 vnc_api_headers= {"Content-Type": "application/json", "charset": "UTF-8"}
 web_api_headers= {"Content-Type": "application/json", "charset": "UTF-8"}
-config_api_url=""
-web_api_url=""
-module=None
-controller_ip=""
-# end: variables
-
-
-def get_config_api_url():
-    return config_api_url
-
-def login_and_check_id(module, name, obj_type, controller_ip, username, password, state, domain='default-domain', project='default-project', fabric='dummy', physical_router='dummy', loadbalancer_pool='dummy'):
-    controller_ip = controller_ip
-    config_api_url = 'http://' + controller_ip + ':8082/'
-    web_api_url = 'https://' + controller_ip + ':8143/'
-    module=module
-
-    ##
-    # get keystone token
-    ##
-    if not os.getenv('OS_AUTH_URL') == None:
-      os_auth_url = os.getenv('OS_AUTH_URL', 'http://' + controller_ip + ':35357/v3')
-      url = os_auth_url + '/auth/tokens?nocatalog'
-      os_auth_type = os.getenv('OS_AUTH_TYPE', 'password')
-      os_username = os.getenv('OS_USER_NAME', 'admin')
-      os_password = os.getenv('OS_PASSWORD', 'contrail123')
-      os_project_domain_name = os.getenv('OS_PROJECT_DOMAIN_NAME', 'Default')
-      os_user_domain_name = os.getenv('OS_USER_DOMAIN_NAME', 'Default')
-      os_project_name = os.getenv('OS_PROJECT_NAME', 'admin')
-      keystone_data = {"auth": {"identity": {"methods": ["{}".format(os_auth_type)], "password": {"user": {"name": "{}".format(os_username), "password": "{}".format(os_password), "domain": {"name": "{}".format(os_user_domain_name)}}}}, "scope": {"project": {"name": "{}".format(os_project_name), "domain": {"name": "{}".format(os_project_domain_name)}}}}}
-      response = requests.post(url, data=json.dumps(keystone_data), headers=vnc_api_headers)
-      if not (response.status_code == 200 or response.status_code == 201):
-        module.fail_json("keystone token cannot be obtained")
-
-      keystone_token = response.headers.get("X-Subject-Token")
-      vnc_api_headers["x-auth-token"]=keystone_token
 
-    ## check if the fqname exists
-    if (obj_type in ['global-system-config']):
-      response = requests.post(config_api_url + 'fqname-to-id', data='{"type": "%s", "fq_name": ["default-global-system-config"]}' % (obj_type), headers=vnc_api_headers)
-    elif (obj_type in ['virtual-machine'] or (obj_type == 'tag' and project == None)):
-      response = requests.post(config_api_url + 'fqname-to-id', data='{"type": "%s", "fq_name": ["%s"]}' % (obj_type, name), headers=vnc_api_headers)
-    elif (obj_type in ['global-vrouter-config']):
-      response = requests.post(config_api_url + 'fqname-to-id', data='{"type": "%s", "fq_name": ["default-global-system-config", "default-global-vrouter-config"]}' % (obj_type), headers=vnc_api_headers)
-    elif (obj_type in ['bgp-router']):
-      response = requests.post(config_api_url + 'fqname-to-id', data='{"type": "%s", "fq_name": ["default-domain", "default-project", "ip-fabric", "__default__", "%s"]}' % (obj_type, name), headers=vnc_api_headers)
-    elif (obj_type in ['fabric', 'api-access-list']):
-      response = requests.post(config_api_url + 'fqname-to-id', data='{"type": "%s", "fq_name": ["default-global-system-config", "%s"]}' % (obj_type, name), headers=vnc_api_headers)
-    elif (obj_type in ['virtual-port-group']):
-      response = requests.post(config_api_url + 'fqname-to-id', data='{"type": "%s", "fq_name": ["default-global-system-config", "%s", "%s"]}' % (obj_type, fabric, name), headers=vnc_api_headers)
-    elif (obj_type in ['physical-interface']):
-      response = requests.post(config_api_url + 'fqname-to-id', data='{"type": "%s", "fq_name": ["default-global-system-config", "%s", "%s"]}' % (obj_type, physical_router, name), headers=vnc_api_headers)
-    elif (obj_type in ['application-policy-set', 'firewall-rule', 'firewall-policy'] and project == None):
-      response = requests.post(config_api_url + 'fqname-to-id', data='{"type": "%s", "fq_name": ["default-policy-management", "%s"]}' % (obj_type, name), headers=vnc_api_headers)
-    elif (obj_type in ['service-template']):
-      response = requests.post(config_api_url + 'fqname-to-id', data='{"type": "%s", "fq_name": ["%s", "%s"]}' % (obj_type, domain, name), headers=vnc_api_headers)
-    elif (obj_type in ['loadbalancer-member']):
-      response = requests.post(config_api_url + 'fqname-to-id', data='{"type": "%s", "fq_name": ["%s", "%s", "%s", "%s"]}' % (obj_type, domain, project, loadbalancer_pool, name), headers=vnc_api_headers)
+
+##
+# errors in worker threads (run_in_parallel) are raised as TFError, and module fails in main thread
+##
+class TFError(Exception):
+  def __init__(self, msg, **kwargs):
+    Exception.__init__(self, msg)
+    self.msg = msg
+    self.kwargs = kwargs
+
+_worker_state = threading.local()
+
+def fail_json(module, msg, **kwargs):
+  if module == None or getattr(_worker_state, 'active', False):
+    raise TFError(msg, **kwargs)
+  module.fail_json(msg=msg, **kwargs)
+
+##
+# js = response_json (response)
+#
+# decode response body only once: later calls for the same response return the same object
+##
+def response_json(response):
+  js = getattr(response, '_tf_json', None)
+  if js == None:
+    js = json.loads(response.text)
+    try:
+      response._tf_json = js
+    except AttributeError:
+      pass
+  return js
+
+##
+# for obj in iter_json_items (response.text, 'virtual-networks', rest):
+#
+# decode items of one list in a json object one by one, without building the whole object,
+# so that only one item is decoded at a time. other keys of that object (e.g. marker) are stored in rest.
+# ValueError is raised when text is not a json object
+##
+_json_decoder = json.JSONDecoder()
+_json_ws = re.compile(r'[ \t\n\r]*')
+
+def iter_json_items(text, key, rest=None):
+  def skip(pos):
+    return _json_ws.match(text, pos).end()
+  def expect(pos, chars):
+    c = text[pos:pos + 1]
+    if not c or not c in chars:
+      raise ValueError("unexpected {!r} at {} in json".format(c, pos))
+    return (c, skip(pos + 1))
+
+  (c, pos) = expect(skip(0), '{')
+  if text[pos:pos + 1] == '}':
+    return
+  while True:
+    k, pos = _json_decoder.raw_decode(text, pos)
+    (c, pos) = expect(skip(pos), ':')
+    if k == key and text[pos:pos + 1] == '[':
+      pos = skip(pos + 1)
+      if text[pos:pos + 1] == ']':
+        pos += 1
+      else:
+        while True:
+          item, pos = _json_decoder.raw_decode(text, pos)
+          yield item
+          (c, pos) = expect(skip(pos), ',]')
+          if c == ']':
+            break
     else:
-      response = requests.post(config_api_url + 'fqname-to-id', data='{"type": "%s", "fq_name": ["%s", "%s", "%s"]}' % (obj_type, domain, project, name), headers=vnc_api_headers)
-    if response.status_code == 200:
-      update = True
-      uuid = json.loads(response.text).get("uuid")
-    elif response.status_code == 404:
+      value, pos = _json_decoder.raw_decode(text, pos)
+      if not rest == None:
+        rest[k] = value
+    (c, pos) = expect(skip(pos), ',}')
+    if c == '}':
+      return
+
+##
+# results = run_in_parallel (module, lambda item: client.resolve('project', item), items)
+#
+# calls fn (item) for each item with bounded number of threads ($TF_CONCURRENCY), and returns results in the same order with items.
+# when some of them failed, module fails with the list of failed items.
+##
+def run_in_parallel(module, fn, items, max_workers=None):
+  items = list(items)
+  if max_workers == None:
+    max_workers = int(os.getenv('TF_CONCURRENCY', '8'))
+  results = [None] * len(items)
+  errors = []
+  if len(items) < 2 or max_workers < 2:
+    for i in range(len(items)):
+      try:
+        results[i] = fn(items[i])
+      except TFError as e:
+        errors.append((i, e))
+    return _parallel_results(module, items, results, errors)
+
+  lock = threading.Lock()
+  indexes = iter(range(len(items)))
+
+  def worker():
+    _worker_state.active = True
+    while True:
+      with lock:
+        i = next(indexes, None)
+      if i == None:
+        return
+      try:
+        results[i] = fn(items[i])
+      except Exception as e:
+        with lock:
+          errors.append((i, e))
+
+  threads = [threading.Thread(target=worker) for j in range(min(max_workers, len(items)))]
+  for thread in threads:
+    thread.daemon = True
+    thread.start()
+  for thread in threads:
+    thread.join()
+  return _parallel_results(module, items, results, errors)
+
+def _parallel_results(module, items, results, errors):
+  if not errors == []:
+    errors.sort(key=lambda error: error[0])
+    for i, e in errors:
+      if not isinstance(e, TFError):
+        raise e
+    failures = [dict(e.kwargs, item=items[i], msg=e.msg) for i, e in errors]
+    fail_json(module, "{} of {} requests failed: {}".format(len(errors), len(items), errors[0][1].msg), failures=failures)
+  return results
+
+
+##
+# response / session which are compatible with requests, used when module is run by httpapi connection
+# (ansible_connection=httpapi, ansible_network_os=tungstenfabric.networking.tungstenfabric)
+##
+class HttpApiResponse(object):
+  def __init__(self, res):
+    self.status_code = res.get("status_code")
+    self.text = res.get("text")
+    self.headers = res.get("headers")
+
+class HttpApiSession(object):
+  def __init__(self, module, socket_path):
+    self.module = module
+    self.connection = Connection(socket_path)
+    self.cookies = {}
+
+  def _call(self, method, *args, **kwargs):
+    try:
+      return getattr(self.connection, method)(*args, **kwargs)
+    except ConnectionError as e:
+      fail_json(self.module, "httpapi connection failed: {}".format(e))
+
+  def keystone_token(self, url, data):
+    return self._call('get_keystone_token', url, data)
+
+  def login(self, url, username, password):
+    csrftoken = self._call('web_login', url, username, password)
+    if csrftoken:
+      self.cookies['_csrf'] = csrftoken
+
+  def request(self, method, url, data=None, headers=None, verify=None, timeout=None):
+    return HttpApiResponse(self._call('send_request', data, url, method=method.upper(), headers=headers))
+
+  def get(self, url, **kwargs):
+    return self.request('GET', url, **kwargs)
+
+  def post(self, url, **kwargs):
+    return self.request('POST', url, **kwargs)
+
+  def put(self, url, **kwargs):
+    return self.request('PUT', url, **kwargs)
+
+  def delete(self, url, **kwargs):
+    return self.request('DELETE', url, **kwargs)
+
+##
+# keep-alive session: one pool per controller endpoint (config-api, webui, keystone),
+# and connections for concurrent requests are reused instead of being discarded
+##
+HTTP_POOL_CONNECTIONS = 4
+HTTP_POOL_MAXSIZE = 16
+
+##
+# response / session which are compatible with requests, built on ansible.module_utils.urls
+# to avoid importing requests (and urllib3, idna, charset_normalizer, certifi) for each task
+##
+HTTP_TIMEOUT = int(os.getenv('TF_HTTP_TIMEOUT', '60'))
+
+class UrlsResponse(object):
+  def __init__(self, status_code, text, headers):
+    self.status_code = status_code
+    self.text = text
+    self.headers = headers
+
+class UrlsSession(object):
+  def __init__(self, module):
+    self.module = module
+    self.cookie_jar = http_cookiejar.CookieJar()
+    self.req = Request(cookies=self.cookie_jar, timeout=HTTP_TIMEOUT)
+
+  @property
+  def cookies(self):
+    # webui's csrf token is available as cookies['_csrf']
+    return dict((cookie.name, cookie.value) for cookie in self.cookie_jar)
+
+  def request(self, method, url, data=None, headers=None, verify=None, timeout=HTTP_TIMEOUT):
+    # certificates are checked unless verify=False is given (webui), same with requests
+    try:
+      response = self.req.open(method.upper(), url, data=data, headers=headers, timeout=timeout, validate_certs=verify)
+      return UrlsResponse(response.getcode(), to_text(response.read()), response.info())
+    except HTTPError as e:
+      try:
+        text = to_text(e.read())
+      except AttributeError:
+        text = ''
+      return UrlsResponse(e.code, text, e.info())
+
+  def get(self, url, **kwargs):
+    return self.request('GET', url, **kwargs)
+
+  def post(self, url, **kwargs):
+    return self.request('POST', url, **kwargs)
+
+  def put(self, url, **kwargs):
+    return self.request('PUT', url, **kwargs)
+
+  def delete(self, url, **kwargs):
+    return self.request('DELETE', url, **kwargs)
+
+##
+# http transport: TF_HTTP_TRANSPORT=auto (default), requests or urls
+#   auto: requests (with keep-alive connection pool) if it is installed, otherwise urls
+#   urls: ansible.module_utils.urls only, no third-party module is imported
+##
+def get_http_transport():
+  transport = os.getenv('TF_HTTP_TRANSPORT', 'auto')
+  if transport == 'urls':
+    return 'urls'
+  try:
+    import requests
+  except ImportError:
+    if transport == 'requests':
+      raise
+    return 'urls'
+  return 'requests'
+
+def open_session(module):
+  socket_path = getattr(module, '_socket_path', None)
+  if socket_path:
+    return HttpApiSession(module, socket_path)
+  if get_http_transport() == 'urls':
+    return UrlsSession(module)
+
+  import requests
+  from requests.adapters import HTTPAdapter
+  session = requests.Session()
+  adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE, pool_block=False)
+  session.mount('http://', adapter)
+  session.mount('https://', adapter)
+  return session
+
+
+##
+# controller endpoints
+#
+# controller_ip can be a comma separated list (x.x.x.x,y.y.y.y,z.z.z.z).
+# read requests are spread over healthy controllers by moving average of latency,
+# and write requests are sent to the first healthy controller in the list.
+# a controller which has connection error, 502, 503 or 504 is skipped for a while.
+# POST which changes something is sent to next controller only when connection couldn't be established.
+# latency and health are kept in $TF_CACHE_DIR/endpoints.json, so that later tasks can use them.
+##
+ENDPOINT_LATENCY_ALPHA = 0.3
+ENDPOINT_DOWN_SECONDS = 30
+
+def parse_controller_ip(controller_ip):
+  return [host for host in controller_ip.replace(',', ' ').split() if host]
+
+class EndpointPool(object):
+  def __init__(self, controller_ip):
+    self.hosts = parse_controller_ip(controller_ip)
+    self.latency = {}
+    self.down_until = {}
+    self.state_file = None
+    if len(self.hosts) > 1:
+      try:
+        self.state_file = os.path.join(get_cache_dir(), 'endpoints.json')
+      except (IOError, OSError):
+        # cache dir is not writable: health is kept only in this process
+        return
+      state = _read_json_file(self.state_file)
+      for host in self.hosts:
+        if host in state:
+          self.latency[host] = state[host].get("latency")
+          self.down_until[host] = state[host].get("down_until", 0)
+      atexit.register(self.save)
+
+  def save(self):
+    state = _read_json_file(self.state_file)
+    for host in self.hosts:
+      state[host] = {"latency": self.latency.get(host), "down_until": self.down_until.get(host, 0)}
+    try:
+      _write_json_file(self.state_file, state)
+    except (IOError, OSError):
+      pass
+
+  def healthy(self, host):
+    return self.down_until.get(host, 0) <= time.time()
+
+  def preferred(self):
+    return self.candidates(read=False)[0]
+
+  def candidates(self, read=True):
+    healthy = [host for host in self.hosts if self.healthy(host)]
+    down = sorted([host for host in self.hosts if not self.healthy(host)], key=lambda host: self.down_until.get(host, 0))
+    if read and len(healthy) > 1:
+      # power of two choices: lower latency one of two random controllers, to spread reads
+      first, second = random.sample(healthy, 2)
+      if (self.latency.get(second) or 0) < (self.latency.get(first) or 0):
+        first = second
+      healthy.remove(first)
+      healthy.insert(0, first)
+    return healthy + down
+
+  def record(self, host, elapsed):
+    latency = self.latency.get(host)
+    if latency == None:
+      self.latency[host] = elapsed
+    else:
+      self.latency[host] = ENDPOINT_LATENCY_ALPHA * elapsed + (1 - ENDPOINT_LATENCY_ALPHA) * latency
+    self.down_until[host] = 0
+
+  def mark_down(self, host):
+    self.down_until[host] = time.time() + ENDPOINT_DOWN_SECONDS
+
+
+##
+# governor: client side backpressure for controller overload
+#
+# - AIMD concurrency window: the number of in-flight requests of this process is limited by the window,
+#   which is increased by 1/window for each success, and halved when controller looks overloaded
+#   (429, 503, 504 or timeout)
+# - retry with jittered exponential backoff, Retry-After header is honored if it is returned
+# - status codes which can be retried depend on the method, since POST (create) might be already processed
+#
+# TF_CONCURRENCY: max window (default: 8), TF_MAX_RETRIES: max retries for each request (default: 3)
+##
+GOVERNOR_BACKOFF_BASE = 0.5
+GOVERNOR_BACKOFF_MAX = 30
+
+RETRY_STATUS_CODES = {
+  'GET': [408, 429, 500, 502, 503, 504],
+  'PUT': [408, 409, 429, 502, 503, 504],
+  'DELETE': [408, 409, 429, 502, 503, 504],
+  'POST': [429, 503]
+}
+CONGESTION_STATUS_CODES = [429, 503, 504]
+
+def _get_header(headers, name):
+  if not headers:
+    return None
+  value = headers.get(name)
+  if value == None:
+    for k in headers:
+      if k.lower() == name.lower():
+        return headers[k]
+  return value
+
+def _is_timeout(error):
+  return isinstance(error, socket.timeout) or 'timeout' in type(error).__name__.lower() or 'timed out' in str(error).lower()
+
+def _is_refused(error):
+  return getattr(error, 'errno', None) == errno.ECONNREFUSED or 'refused' in str(error).lower()
+
+# request was not sent at all, since connection couldn't be established
+def _is_connect_error(error):
+  return _is_refused(error) or getattr(error, 'errno', None) in [errno.EHOSTUNREACH, errno.ENETUNREACH] or type(error).__name__ == 'ConnectTimeout' or 'failed to establish a new connection' in str(error).lower()
+
+class Governor(object):
+  def __init__(self, max_window, max_retries):
+    self.max_window = max(1, max_window)
+    self.window = float(self.max_window)
+    self.max_retries = max_retries
+    self.in_flight = 0
+    self.cond = threading.Condition()
+
+  def acquire(self):
+    with self.cond:
+      while self.in_flight >= int(self.window):
+        self.cond.wait()
+      self.in_flight += 1
+
+  def release(self, congested):
+    with self.cond:
+      self.in_flight -= 1
+      if congested:
+        self.window = max(1.0, self.window / 2)
+      else:
+        self.window = min(float(self.max_window), self.window + 1 / self.window)
+      self.cond.notify_all()
+
+  def retryable(self, method, read, response, error):
+    if read:
+      method = 'GET'
+    if not error == None:
+      # POST might be already processed, if connection is lost after it is sent
+      return not method == 'POST' or _is_refused(error)
+    return response.status_code in RETRY_STATUS_CODES.get(method, [])
+
+  def backoff(self, attempt, response):
+    retry_after = None
+    if not response == None:
+      retry_after = _get_header(response.headers, 'Retry-After')
+    if retry_after:
+      try:
+        return min(GOVERNOR_BACKOFF_MAX, max(0, float(retry_after)))
+      except ValueError:
+        retry_date = parsedate(retry_after)
+        if retry_date:
+          return min(GOVERNOR_BACKOFF_MAX, max(0, calendar.timegm(retry_date) - time.time()))
+    # full jitter
+    return random.uniform(0, min(GOVERNOR_BACKOFF_MAX, GOVERNOR_BACKOFF_BASE * (2 ** attempt)))
+
+  ##
+  # governor.call (lambda: session.request(...), 'PUT')
+  # governor.call (lambda: session.request(...), 'POST', read=True)  # e.g. fqname-to-id
+  ##
+  def call(self, fn, method, read=False):
+    attempt = 0
+    while True:
+      response = None
+      error = None
+      self.acquire()
+      try:
+        response = fn()
+      except (IOError, OSError) as e:
+        error = e
+      finally:
+        self.release(_is_timeout(error) or (not response == None and response.status_code in CONGESTION_STATUS_CODES))
+      if attempt >= self.max_retries or not self.retryable(method, read, response, error):
+        if not error == None:
+          raise error
+        return response
+      time.sleep(self.backoff(attempt, response))
+      attempt += 1
+
+governor = Governor(int(os.getenv('TF_CONCURRENCY', '8')), int(os.getenv('TF_MAX_RETRIES', '3')))
+
+
+##
+# client for config-api (8082), all the config-api requests are sent through this object
+#
+# config_api.post('fqname-to-id', data=json.dumps({"type": "project", "fq_name": ["default-domain", "admin"]}))
+# config_api.get('virtual-port-group/' + uuid)
+##
+
+# POST requests which don't change anything, and can be sent to any controller
+READ_ONLY_POSTS = ['fqname-to-id', 'id-to-fqname', 'list-bulk-collection']
+
+class ConfigApiClient(object):
+  def __init__(self, module, session, pool, headers):
+    self.module = module
+    self.session = session
+    self.pool = pool
+    self.headers = headers
+    self.keystone = None
+    # on_write (method, path, data, response) is called when create / delete succeeded
+    self.on_write = None
+
+  def set_keystone(self, os_auth_url, keystone_data):
+    self.keystone = (os_auth_url, keystone_data)
+    self.headers["x-auth-token"] = get_keystone_token(self.module, self.session, os_auth_url, keystone_data)
+
+  def _send(self, method, path, data=None, read=False):
+    # POST (create, execute-job etc) might be already processed by the controller,
+    # so it is sent to next controller only when connection couldn't be established
+    replayable = read or not method == 'POST'
+    response = None
+    error = None
+    for host in self.pool.candidates(read=read):
+      start = time.time()
+      try:
+        response = self.session.request(method, 'http://' + host + ':8082/' + path, data=data, headers=self.headers, timeout=HTTP_TIMEOUT)
+      except (IOError, OSError) as e:
+        # connection refused, timeout etc: try next controller
+        if not replayable and not _is_connect_error(e):
+          raise
+        self.pool.mark_down(host)
+        error = e
+        continue
+      if response.status_code >= 500 and replayable:
+        # 500 can be an error of this request, so only 502, 503 and 504 mark the controller down
+        if not response.status_code == 500:
+          self.pool.mark_down(host)
+        continue
+      self.pool.record(host, time.time() - start)
+      return response
+    if response == None:
+      raise error
+    return response
+
+  def _governed_send(self, method, path, data=None):
+    read = method == 'GET' or (method == 'POST' and path.split('?')[0] in READ_ONLY_POSTS)
+    try:
+      return governor.call(lambda: self._send(method, path, data=data, read=read), method, read=read)
+    except (IOError, OSError) as e:
+      fail_json(self.module, "config-api is not reachable: {}".format(e))
+
+  def request(self, method, path, data=None):
+    response = self._governed_send(method, path, data=data)
+    if response.status_code == 401 and self.keystone and not isinstance(self.session, HttpApiSession):
+      # cached keystone token might be revoked: get a new one and retry
+      os_auth_url, keystone_data = self.keystone
+      self.headers["x-auth-token"] = get_keystone_token(self.module, self.session, os_auth_url, keystone_data, rejected_token=self.headers.get("x-auth-token"))
+      response = self._governed_send(method, path, data=data)
+    if response.status_code == 200 and method in ['POST', 'DELETE'] and not self.on_write == None:
+      self.on_write(method, path, data, response)
+    return response
+
+  def get(self, path):
+    return self.request('GET', path)
+
+  def post(self, path, data=None):
+    return self.request('POST', path, data=data)
+
+  def put(self, path, data=None):
+    return self.request('PUT', path, data=data)
+
+  def delete(self, path, data=None):
+    return self.request('DELETE', path, data=data)
+
+##
+# keystone token cache
+#
+# tokens are stored in $TF_CACHE_DIR/keystone_tokens.json (default: ~/.cache/tungstenfabric-networking)
+# with its expires_at, so that concurrent forks and later tasks can reuse one token.
+# set TF_KEYSTONE_TOKEN_CACHE=no to disable this cache.
+##
+KEYSTONE_TOKEN_EXPIRY_MARGIN = 60
+
+def get_cache_dir(create=True):
+  cache_dir = os.getenv('TF_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'tungstenfabric-networking'))
+  if not create:
+    return cache_dir
+  try:
+    os.makedirs(cache_dir, 0o700)
+  except OSError:
+    if not os.path.isdir(cache_dir):
+      raise
+  return cache_dir
+
+def _read_json_file(path):
+  try:
+    with open(path) as f:
+      return json.load(f)
+  except (IOError, OSError, ValueError):
+    return {}
+
+def _write_json_file(path, data):
+  tmp_path = "{}.{}".format(path, os.getpid())
+  fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+  with os.fdopen(fd, 'w') as f:
+    json.dump(data, f)
+  os.rename(tmp_path, path)
+
+def _parse_expires_at(expires_at):
+  # e.g. 2020-05-01T12:34:56.000000Z
+  try:
+    return calendar.timegm(time.strptime(expires_at[:19], '%Y-%m-%dT%H:%M:%S'))
+  except (TypeError, ValueError):
+    return 0
+
+def _request_keystone_token(module, session, os_auth_url, keystone_data):
+  url = os_auth_url + '/auth/tokens?nocatalog'
+  response = session.post(url, data=json.dumps(keystone_data), headers={"Content-Type": "application/json", "charset": "UTF-8"}, timeout=HTTP_TIMEOUT)
+  if not (response.status_code == 200 or response.status_code == 201):
+    fail_json(module, "keystone token cannot be obtained")
+
+  keystone_token = response.headers.get("X-Subject-Token")
+  try:
+    expires_at = _parse_expires_at(response_json(response).get("token").get("expires_at"))
+  except (ValueError, AttributeError):
+    expires_at = 0
+  return (keystone_token, expires_at)
+
+##
+# get_keystone_token (module, session, os_auth_url, keystone_data)
+# get_keystone_token (module, session, os_auth_url, keystone_data, rejected_token='xxxx')  # when config-api returned 401
+##
+def get_keystone_token(module, session, os_auth_url, keystone_data, rejected_token=None):
+  if isinstance(session, HttpApiSession):
+    # ansible-connection keeps the token
+    keystone_token = session.keystone_token(os_auth_url + '/auth/tokens?nocatalog', json.dumps(keystone_data))
+    if not keystone_token:
+      fail_json(module, "keystone token cannot be obtained")
+    return keystone_token
+
+  if os.getenv('TF_KEYSTONE_TOKEN_CACHE', 'yes').lower() in ['no', 'false', '0']:
+    return _request_keystone_token(module, session, os_auth_url, keystone_data)[0]
+
+  user = keystone_data["auth"]["identity"]["password"]["user"]
+  scope = keystone_data["auth"]["scope"]["project"]
+  key = "|".join((os_auth_url, user["domain"]["name"], user["name"], scope["domain"]["name"], scope["name"]))
+
+  # the cache is best effort: when cache dir or lock cannot be used, a new token is requested
+  try:
+    cache_file = os.path.join(get_cache_dir(), 'keystone_tokens.json')
+    lock_fd = os.open(cache_file + '.lock', os.O_RDWR | os.O_CREAT, 0o600)
+  except (IOError, OSError):
+    return _request_keystone_token(module, session, os_auth_url, keystone_data)[0]
+  try:
+    # other forks wait here while one of them gets a new token
+    try:
+      fcntl.flock(lock_fd, fcntl.LOCK_EX)
+    except (IOError, OSError):
+      return _request_keystone_token(module, session, os_auth_url, keystone_data)[0]
+    now = time.time()
+    tokens = _read_json_file(cache_file)
+    entry = tokens.get(key)
+    if entry and entry.get("expires_at", 0) - KEYSTONE_TOKEN_EXPIRY_MARGIN > now and not entry.get("token") == rejected_token:
+      return entry.get("token")
+
+    keystone_token, expires_at = _request_keystone_token(module, session, os_auth_url, keystone_data)
+    tokens = dict((k, v) for k, v in tokens.items() if v.get("expires_at", 0) > now)
+    if expires_at > now:
+      tokens[key] = {"token": keystone_token, "expires_at": expires_at}
+    try:
+      _write_json_file(cache_file, tokens)
+    except (IOError, OSError):
+      pass
+    return keystone_token
+  finally:
+    try:
+      fcntl.flock(lock_fd, fcntl.LOCK_UN)
+    except (IOError, OSError):
+      pass
+    os.close(lock_fd)
+
+
+##
+# parent types, which are used to list fq_names of one type in a few requests (TFClient.resolve_many)
+##
+PARENT_TYPES = {
+  'project': 'domain',
+  'service-template': 'domain',
+  'virtual-network': 'project',
+  'network-policy': 'project',
+  'network-ipam': 'project',
+  'security-group': 'project',
+  'virtual-machine-interface': 'project',
+  'service-instance': 'project',
+  'service-health-check': 'project',
+  'logical-router': 'project',
+  'loadbalancer': 'project',
+  'loadbalancer-pool': 'project',
+  'loadbalancer-listener': 'project',
+  'bgp-as-a-service': 'project',
+  'fabric': 'global-system-config',
+  'physical-router': 'global-system-config',
+  'virtual-port-group': 'fabric',
+  'physical-interface': 'physical-router',
+  'routing-instance': 'virtual-network',
+  'bgp-router': 'routing-instance',
+}
+
+# these are under default-policy-management, or project
+POLICY_MANAGEMENT_TYPES = ['application-policy-set', 'firewall-policy', 'firewall-rule', 'address-group', 'service-group', 'tag']
+
+# parent uuids in one list-bulk-collection, and objects in one page
+BULK_RESOLVE_PARENTS = 50
+BULK_PAGE_LIMIT = 1000
+# fewer fq_names than this are resolved by fqname-to-id (in parallel), instead of listing their parents' children
+BULK_RESOLVE_MIN = 8
+
+# length of fq_name of each parent type: children have one more
+PARENT_FQ_NAME_LENGTH = {
+  'domain': 1,
+  'project': 2,
+  'global-system-config': 1,
+  'policy-management': 1,
+  'fabric': 2,
+  'physical-router': 2,
+  'virtual-network': 3,
+  'routing-instance': 4,
+}
+
+def get_parent_type(obj_type, fq_name):
+  if obj_type in POLICY_MANAGEMENT_TYPES:
+    if len(fq_name) == 2 and fq_name[0] == 'default-policy-management':
+      return 'policy-management'
+    elif len(fq_name) == 3:
+      return 'project'
+    return None
+  return PARENT_TYPES.get(obj_type)
+
+
+##
+# fq_name -> uuid cache on disk, shared by later tasks and runs
+#
+# entries are stored in $TF_CACHE_DIR/fqname.db (sqlite) for each controller.
+# set TF_FQNAME_CACHE_TTL (seconds) to enable this cache.
+# entries older than TTL are revalidated with id-to-fqname, instead of fqname-to-id.
+# without TTL, the file is not read, but it is still updated when it exists (e.g. tf_uuid lookup created it),
+# so that objects which are deleted and re-created by modules don't leave old uuids there
+##
+def open_fqname_store(controller, ttl=None):
+  if ttl == None:
+    ttl = int(os.getenv('TF_FQNAME_CACHE_TTL', '0'))
+  if not HAS_SQLITE3:
+    return None
+  try:
+    if ttl <= 0 and not os.path.exists(os.path.join(get_cache_dir(create=False), 'fqname.db')):
+      return None
+    return FqnameStore(os.path.join(get_cache_dir(), 'fqname.db'), controller, ttl)
+  except (sqlite3.Error, OSError):
+    return None
+
+class SqliteStore(object):
+  def __init__(self, path, schema):
+    self.lock = threading.Lock()
+    self.db = sqlite3.connect(path, timeout=10, check_same_thread=False)
+    self.db.execute(schema)
+    self.db.commit()
+
+  def _execute(self, sql, args):
+    # cache is best effort: locked or broken db is just ignored
+    with self.lock:
+      try:
+        rows = self.db.execute(sql, args).fetchall()
+        self.db.commit()
+        return rows
+      except sqlite3.Error:
+        return []
+
+class FqnameStore(SqliteStore):
+  def __init__(self, path, controller, ttl):
+    SqliteStore.__init__(self, path, 'CREATE TABLE IF NOT EXISTS fqname (controller TEXT, type TEXT, fq_name TEXT, uuid TEXT, checked_at REAL, PRIMARY KEY (controller, type, fq_name))')
+    self.controller = controller
+    self.ttl = ttl
+
+  ##
+  # returns (uuid, fresh), or None when it is not cached (always None without TTL)
+  ##
+  def get(self, obj_type, fq_name):
+    if self.ttl <= 0:
+      return None
+    rows = self._execute('SELECT uuid, checked_at FROM fqname WHERE controller = ? AND type = ? AND fq_name = ?', (self.controller, obj_type, json.dumps(fq_name)))
+    if rows == []:
+      return None
+    uuid, checked_at = rows[0]
+    return (uuid, time.time() - checked_at < self.ttl)
+
+  def put(self, obj_type, fq_name, uuid):
+    self._execute('INSERT OR REPLACE INTO fqname VALUES (?, ?, ?, ?, ?)', (self.controller, obj_type, json.dumps(fq_name), uuid, time.time()))
+
+  def delete(self, obj_type, fq_name):
+    self._execute('DELETE FROM fqname WHERE controller = ? AND type = ? AND fq_name = ?', (self.controller, obj_type, json.dumps(fq_name)))
+
+  def delete_uuid(self, uuid):
+    self._execute('DELETE FROM fqname WHERE controller = ? AND uuid = ?', (self.controller, uuid))
+
+
+##
+# fetched objects on disk, with their id_perms.last_modified
+#
+# entries are stored in $TF_CACHE_DIR/objects.db (sqlite) for each controller.
+# set TF_OBJECT_CACHE=1 to enable this cache.
+# only objects which are fetched with fields= (without back_refs and children) are cached,
+# since adding back_refs or children doesn't change last_modified of the object
+##
+def open_object_store(controller):
+  if not os.getenv('TF_OBJECT_CACHE', '0') == '1' or not HAS_SQLITE3:
+    return None
+  try:
+    return ObjectStore(os.path.join(get_cache_dir(), 'objects.db'), controller)
+  except (sqlite3.Error, OSError):
+    return None
+
+class ObjectStore(SqliteStore):
+  def __init__(self, path, controller):
+    SqliteStore.__init__(self, path, 'CREATE TABLE IF NOT EXISTS object (controller TEXT, uuid TEXT, fields TEXT, last_modified TEXT, body TEXT, PRIMARY KEY (controller, uuid, fields))')
+    self.controller = controller
+
+  ##
+  # returns body, or None when it is not cached or last_modified is different
+  ##
+  def get(self, uuid, fields, last_modified):
+    rows = self._execute('SELECT last_modified, body FROM object WHERE controller = ? AND uuid = ? AND fields = ?', (self.controller, uuid, ",".join(fields)))
+    if rows == [] or not rows[0][0] == last_modified:
+      return None
+    return json.loads(rows[0][1])
+
+  def put(self, uuid, fields, last_modified, body):
+    self._execute('INSERT OR REPLACE INTO object VALUES (?, ?, ?, ?, ?)', (self.controller, uuid, ",".join(fields), last_modified, json.dumps(body)))
+
+  def delete_uuid(self, uuid):
+    self._execute('DELETE FROM object WHERE controller = ? AND uuid = ?', (self.controller, uuid))
+
+
+##
+# write backend
+#
+# TF_API_BACKEND=webui (default): create / update / delete are sent to webui (8143)
+# TF_API_BACKEND=config-api: those are directly sent to config-api (8082), without webui login.
+#   composite objects which webui creates with its children still use webui.
+##
+WEB_UI_ONLY_TYPES = ['service-instance', 'loadbalancer', 'logical-router']
+
+# fields which are only for webui, or which config-api doesn't accept with update
+WEB_UI_ONLY_FIELDS = ['href', 'versionList']
+
+# fields which are always kept in the object which is fetched with fields=
+OBJECT_IDENTITY_FIELDS = ['uuid', 'fq_name', 'parent_type', 'parent_uuid']
+
+def get_api_backend(obj_type):
+  backend = os.getenv('TF_API_BACKEND', 'webui')
+  if backend == 'config-api' and not obj_type in WEB_UI_ONLY_TYPES:
+    return 'config-api'
+  return 'webui'
+
+def config_api_payload(payload, obj_type):
+  js = json.loads(payload)
+  obj = js.get(obj_type)
+  for k in list(obj):
+    if k in WEB_UI_ONLY_FIELDS or k.endswith('_back_refs'):
+      del obj[k]
+  return json.dumps({obj_type: obj})
+
+
+##
+# client for one tungstenfabric cluster: keeps its own headers, tokens, session and urls,
+# so nothing is shared between clients and it can be used from several threads
+#
+# client = TFClient(module, controller_ip, username, password)
+# client = TFClient(None, controller_ip)  # without module (e.g. from lookup plugin), errors are raised as TFError
+# client.config_api.post('fqname-to-id', data=json.dumps({"type": "project", "fq_name": ["default-domain", "admin"]}))
+# client.web_api_request('POST', 'api/tenants/config/create-config-object', data=payload)
+##
+class TFClient(object):
+  def __init__(self, module, controller_ip, username=None, password=None, fqname_cache_ttl=None):
+    self.module = module
+    self.controller_ip = controller_ip
+    self.pool = EndpointPool(controller_ip)
+    if self.pool.hosts == []:
+      fail_json(module, "controller_ip is empty")
+    self.session = open_session(module)
+    self.vnc_api_headers = dict(vnc_api_headers)
+    self.web_api_headers = dict(web_api_headers)
+    self.config_api = ConfigApiClient(module, self.session, self.pool, self.vnc_api_headers)
+    self.config_api.on_write = self._on_config_api_write
+    self.web_api_url = ''
+    self.web_api_credentials = (username, password)
+    self.web_api_login_thread = None
+    # (obj_type, fq_name) -> uuid (None when it doesn't exist), so that each fq_name is resolved at most once in a run
+    self.fqname_cache = {}
+    self.fqname_cache_lock = threading.Lock()
+    self.fqname_store = open_fqname_store(",".join(sorted(self.pool.hosts)), fqname_cache_ttl)
+    self.object_store = open_object_store(",".join(sorted(self.pool.hosts)))
+    # (obj_type, fq_name) of the object which login_and_check_id checked
+    self.target = None
+    # True when login_and_check_id fetched only some fields of the target, so update has to be a partial PUT to config-api
+    self.projected = False
+    # copy of the object which login_and_check_id fetched, before modules change it (to compare with the payload)
+    self.live = None
+
+  ##
+  # get keystone token, when OS_AUTH_URL is set
+  ##
+  def keystone_login(self):
+    if os.getenv('OS_AUTH_URL') == None:
+      return
+    os_auth_url = os.getenv('OS_AUTH_URL', 'http://' + self.pool.hosts[0] + ':35357/v3')
+    os_auth_type = os.getenv('OS_AUTH_TYPE', 'password')
+    os_username = os.getenv('OS_USER_NAME', 'admin')
+    os_password = os.getenv('OS_PASSWORD', 'contrail123')
+    os_project_domain_name = os.getenv('OS_PROJECT_DOMAIN_NAME', 'Default')
+    os_user_domain_name = os.getenv('OS_USER_DOMAIN_NAME', 'Default')
+    os_project_name = os.getenv('OS_PROJECT_NAME', 'admin')
+    keystone_data = {"auth": {"identity": {"methods": ["{}".format(os_auth_type)], "password": {"user": {"name": "{}".format(os_username), "password": "{}".format(os_password), "domain": {"name": "{}".format(os_user_domain_name)}}}}, "scope": {"project": {"name": "{}".format(os_project_name), "domain": {"name": "{}".format(os_project_domain_name)}}}}}
+    self.config_api.set_keystone(os_auth_url, keystone_data)
+
+  ##
+  # login to webui: webui session is kept by one controller, so use the first healthy one
+  #
+  # web_api_login_start () starts login in background, web_api_login () waits for it
+  ##
+  def _web_api_login(self):
+    username, password = self.web_api_credentials
+    for host in self.pool.candidates(read=False):
+      url = 'https://' + host + ':8143/'
+      try:
+        if isinstance(self.session, HttpApiSession):
+          self.session.login(url, username, password)
+        else:
+          response = self.session.post(url + 'authenticate', data=json.dumps({"username": username, "password": password}), headers=self.web_api_headers, verify=False, timeout=HTTP_TIMEOUT)
+      except (IOError, OSError):
+        self.pool.mark_down(host)
+        continue
+      if '_csrf' in self.session.cookies:
+        self.web_api_headers["x-csrf-token"]=self.session.cookies['_csrf']
+        self.web_api_url = url
+        return
+
+  def _web_api_login_background(self):
+    # failure is reported when web_api_login () retries it in main thread
+    _worker_state.active = True
+    try:
+      self._web_api_login()
+    except TFError:
+      pass
+
+  def web_api_login_start(self):
+    self.web_api_login_thread = threading.Thread(target=self._web_api_login_background)
+    self.web_api_login_thread.daemon = True
+    self.web_api_login_thread.start()
+
+  def web_api_login(self):
+    if not self.web_api_login_thread == None:
+      self.web_api_login_thread.join()
+      self.web_api_login_thread = None
+    if not self.web_api_url:
+      self._web_api_login()
+    if not self.web_api_url:
+      fail_json(self.module, "webui login failed")
+
+  ##
+  # client.resolve ('virtual-network', 'default-domain:admin:vn1')
+  # client.resolve ('virtual-network', ['default-domain', 'admin', 'vn1'])
+  #
+  # returns uuid of the fq_name, or None when it doesn't exist
+  ##
+  def resolve(self, obj_type, fq_name):
+    if (isinstance(fq_name, string_types)):
+      fq_name = fq_name.split(":")
+    obj_type = obj_type.replace('_', '-')
+    fq_name = list(fq_name)
+    key = (obj_type, tuple(fq_name))
+    with self.fqname_cache_lock:
+      if key in self.fqname_cache:
+        return self.fqname_cache[key]
+
+    uuid = None
+    if not self.fqname_store == None:
+      cached = self.fqname_store.get(obj_type, fq_name)
+      if not cached == None:
+        uuid, fresh = cached
+        if not fresh and not self._revalidate(obj_type, fq_name, uuid):
+          self.fqname_store.delete(obj_type, fq_name)
+          uuid = None
+
+    if uuid == None:
+      response = self.config_api.post('fqname-to-id', data=json.dumps({"type": obj_type, "fq_name": fq_name}))
+      if response.status_code == 404:
+        # negative cache: the same miss is not requested again in this run
+        with self.fqname_cache_lock:
+          self.fqname_cache[key] = None
+        return None
+      elif response.status_code == 401:
+        fail_json(self.module, "config-api's /fqname-to-id access is not authorized. please check keystone client env, such as OS_AUTH_URL.")
+      elif not response.status_code == 200:
+        fail_json(self.module, "config-api's /fqname-to-id failed.", message=response.text)
+      uuid = response_json(response).get("uuid")
+      if not self.fqname_store == None:
+        self.fqname_store.put(obj_type, fq_name, uuid)
+
+    with self.fqname_cache_lock:
+      self.fqname_cache[key] = uuid
+    return uuid
+
+  ##
+  # client.resolve_many ('firewall-rule', ['default-domain:admin:rule1', 'default-domain:admin:rule2'])
+  #
+  # same with resolve, but many uuids are obtained by list-bulk-collection of their parents, in a few requests.
+  # a few fq_names, or parents with too many children (counted first), are resolved by fqname-to-id in parallel
+  # returns list of uuid (None when it doesn't exist), in the same order with fq_names
+  ##
+  def resolve_many(self, obj_type, fq_names):
+    obj_type = obj_type.replace('_', '-')
+    fq_names = [fq_name.split(":") if isinstance(fq_name, string_types) else list(fq_name) for fq_name in fq_names]
+    uuids = {}
+    pending = []
+    for fq_name in fq_names:
+      key = (obj_type, tuple(fq_name))
+      with self.fqname_cache_lock:
+        if key in self.fqname_cache:
+          uuids[key] = self.fqname_cache[key]
+          continue
+      if not self.fqname_store == None:
+        cached = self.fqname_store.get(obj_type, fq_name)
+        if not cached == None and cached[1]:
+          uuids[key] = cached[0]
+          continue
+      if not key in pending:
+        pending.append(key)
+
+    ## group by parent. fq_names which don't have the usual depth (e.g. vmi under virtual-machine) are resolved one by one
+    singles = []
+    children = {}
+    for key in pending:
+      parent_type = get_parent_type(obj_type, list(key[1]))
+      if len(pending) < BULK_RESOLVE_MIN or parent_type == None or not len(key[1]) == PARENT_FQ_NAME_LENGTH.get(parent_type, 0) + 1:
+        singles.append(key)
+        continue
+      children.setdefault((parent_type, key[1][:-1]), []).append(key)
+    parents = []
+    for parent_type, parent_fq_name in children:
+      parent_uuid = self.resolve(parent_type, list(parent_fq_name))
+      if parent_uuid == None:
+        # parent doesn't exist, so children don't exist either
+        for key in children[(parent_type, parent_fq_name)]:
+          uuids[key] = None
+          with self.fqname_cache_lock:
+            self.fqname_cache[key] = None
+      else:
+        parents.append((parent_uuid, children[(parent_type, parent_fq_name)]))
+
+    ## list children of the parents, only when it needs fewer requests than fqname-to-id for each of them
+    for i in range(0, len(parents), BULK_RESOLVE_PARENTS):
+      parent_uuids = ",".join([parent_uuid for parent_uuid, keys in parents[i:i + BULK_RESOLVE_PARENTS]])
+      wanted = set([key for parent_uuid, keys in parents[i:i + BULK_RESOLVE_PARENTS] for key in keys])
+      try:
+        count = self.count_objects(obj_type, parent_id=parent_uuids)
+      except TFError:
+        count = None
+      objs = None
+      if not count == None and (count + BULK_PAGE_LIMIT - 1) // BULK_PAGE_LIMIT < len(wanted):
+        objs = self.list_objects(obj_type, parent_id=parent_uuids)
+      if objs == None:
+        singles.extend(wanted)
+        continue
+      for obj in objs:
+        key = (obj_type, tuple(obj.get("fq_name", [])))
+        if key in wanted:
+          uuids[key] = obj.get("uuid")
+          self.remember(obj_type, key[1], uuids[key])
+      for key in wanted:
+        if not key in uuids:
+          uuids[key] = None
+          with self.fqname_cache_lock:
+            self.fqname_cache[key] = None
+
+    for key, uuid in zip(singles, run_in_parallel(self.module, lambda key: self.resolve(obj_type, list(key[1])), singles)):
+      uuids[key] = uuid
+
+    return [uuids[(obj_type, tuple(fq_name))] for fq_name in fq_names]
+
+  ##
+  # client.prefetch ([('network-policy', 'default-domain:admin:np1'), ('tag', 'default-domain:admin:site=A')])
+  #
+  # resolves all the fq_names in bulk (types in parallel), and returns the list of ones which don't exist
+  ##
+  def prefetch(self, refs):
+    fq_names = {}
+    for obj_type, fq_name in refs:
+      fq_names.setdefault(obj_type.replace('_', '-'), []).append(fq_name.split(":") if isinstance(fq_name, string_types) else list(fq_name))
+    obj_types = sorted(fq_names)
+    uuids = run_in_parallel(self.module, lambda obj_type: self.resolve_many(obj_type, fq_names[obj_type]), obj_types)
+    missing = []
+    for obj_type, type_uuids in zip(obj_types, uuids):
+      for fq_name, uuid in zip(fq_names[obj_type], type_uuids):
+        if uuid == None and not {"type": obj_type, "fq_name": fq_name} in missing:
+          missing.append({"type": obj_type, "fq_name": fq_name})
+    return missing
+
+  ##
+  # for objs in client.iter_pages ('virtual-network', detail=True):
+  #
+  # for objs, marker in client.iter_pages ('virtual-network', with_marker=True, page_marker=marker):
+  #
+  # list-bulk-collection, page by page, so that only one page is kept in memory.
+  # with_marker=True also yields page_marker of the next page (None for the last page)
+  # TFError is raised when it failed
+  ##
+  def iter_pages(self, obj_type, page_limit=BULK_PAGE_LIMIT, with_marker=False, **kwargs):
+    data = dict(kwargs)
+    data["type"] = obj_type
+    data["page_limit"] = page_limit
+    while True:
+      response = self.config_api.post('list-bulk-collection', data=json.dumps(data))
+      if not response.status_code == 200:
+        raise TFError("cannot list {}".format(obj_type), message=response.text)
+      js = response_json(response)
+      if with_marker:
+        yield (js.get(obj_type + 's', []), js.get("marker") or None)
+      else:
+        yield js.get(obj_type + 's', [])
+      if not js.get("marker"):
+        return
+      data["page_marker"] = js.get("marker")
+
+  ##
+  # state = {}
+  # for obj in client.iter_objects ('virtual-network', detail=True, max_pages=10, state=state):
+  #
+  # objects one by one: each page is decoded incrementally (iter_json_items), so the whole page is not kept as a list.
+  # after it is done, state has "pages" and "marker" of the next page (None when all the pages are listed)
+  # TFError is raised when it failed
+  ##
+  def iter_objects(self, obj_type, page_limit=BULK_PAGE_LIMIT, max_pages=0, state=None, **kwargs):
+    if state == None:
+      state = {}
+    state["pages"] = 0
+    state["marker"] = None
+    data = dict(kwargs)
+    data["type"] = obj_type
+    data["page_limit"] = page_limit
+    while True:
+      response = self.config_api.post('list-bulk-collection', data=json.dumps(data))
+      if not response.status_code == 200:
+        raise TFError("cannot list {}".format(obj_type), message=response.text)
+      rest = {}
+      try:
+        for obj in iter_json_items(response.text, obj_type + 's', rest):
+          yield obj
+      except ValueError as e:
+        raise TFError("cannot decode {} list: {}".format(obj_type, e))
+      state["pages"] += 1
+      state["marker"] = rest.get("marker") or None
+      if state["marker"] == None or (max_pages > 0 and state["pages"] >= max_pages):
+        return
+      data["page_marker"] = state["marker"]
+
+  ##
+  # client.count_objects ('virtual-machine-interface', parent_id='xxxx-xxxx') -> 10
+  #
+  # list-bulk-collection with count=True, so that objects themselves are not listed
+  # TFError is raised when it failed
+  ##
+  def count_objects(self, obj_type, **kwargs):
+    data = dict(kwargs)
+    data["type"] = obj_type
+    data["count"] = True
+    response = self.config_api.post('list-bulk-collection', data=json.dumps(data))
+    if not response.status_code == 200:
+      raise TFError("cannot count {}".format(obj_type), message=response.text)
+    try:
+      return int(response_json(response).get(obj_type + 's').get("count"))
+    except (ValueError, TypeError, AttributeError):
+      raise TFError("cannot count {}".format(obj_type), message=response.text)
+
+  ##
+  # client.list_objects ('virtual-network', parent_id='xxxx-xxxx,yyyy-yyyy')
+  #
+  # returns list of {"fq_name": [...], "uuid": "xxxx-xxxx", ...}, or None when it failed
+  ##
+  def list_objects(self, obj_type, **kwargs):
+    objs = []
+    try:
+      for page in self.iter_pages(obj_type, **kwargs):
+        objs.extend(page)
+    except TFError:
+      return None
+    return objs
+
+  ##
+  # check that cached uuid still has that fq_name, and refresh its timestamp
+  ##
+  def _revalidate(self, obj_type, fq_name, uuid):
+    response = self.config_api.post('id-to-fqname', data=json.dumps({"uuid": uuid}))
+    if not response.status_code == 200:
+      return False
+    js = response_json(response)
+    if not (js.get("type", "").replace('_', '-') == obj_type and js.get("fq_name") == fq_name):
+      return False
+    self.fqname_store.put(obj_type, fq_name, uuid)
+    return True
+
+  ##
+  # client.get_object ('virtual-network', uuid, fields=['network_ipam_refs', 'route_target_list'])
+  #
+  # with fields, config-api returns only those fields (and uuid, fq_name etc), without back_refs and children
+  # returns {"virtual-network": {...}}, or None when it is not found
+  ##
+  def get_object(self, obj_type, uuid, fields=None):
+    ## cached object is used when last_modified is the same
+    last_modified = None
+    if fields and not self.object_store == None:
+      last_modified = self.get_last_modified(obj_type, uuid)
+      if not last_modified == None:
+        js = self.object_store.get(uuid, fields, last_modified)
+        if not js == None:
+          return js
+
+    path = obj_type + '/' + uuid
+    if fields:
+      path += '?fields={}&exclude_back_refs=true&exclude_children=true'.format(",".join(fields))
+    response = self.config_api.get(path)
+    if response.status_code == 404:
+      return None
+    if not response.status_code == 200:
+      fail_json(self.module, "cannot obtain {} object detail".format(obj_type), message=response.text)
+    js = response_json(response)
+    if fields:
+      ## older config-api might ignore fields=, so keep only the requested ones anyway
+      obj = js.get(obj_type, {})
+      js = {obj_type: dict([(k, v) for k, v in obj.items() if k in fields or k in OBJECT_IDENTITY_FIELDS])}
+      # last_modified which is obtained before the fetch: when it is updated meanwhile, it is fetched again next time
+      if not last_modified == None:
+        self.object_store.put(uuid, fields, last_modified, js)
+    return js
+
+  ##
+  # client.get_last_modified ('virtual-network', uuid) -> '2020-10-01T00:00:00.000000', or None
+  ##
+  def get_last_modified(self, obj_type, uuid):
+    response = self.config_api.get(obj_type + '/' + uuid + '?fields=id_perms&exclude_back_refs=true&exclude_children=true')
+    if not response.status_code == 200:
+      return None
+    try:
+      return response_json(response).get(obj_type, {}).get("id_perms", {}).get("last_modified")
+    except (ValueError, AttributeError):
+      return None
+
+  ##
+  # objs = client.get_objects ([('port-tuple', 'xxxx-xxxx'), ('virtual-machine-interface', 'yyyy-yyyy'), ...])
+  #
+  # get many objects of several types at once, and returns {uuid: {...}} (objects which are not found are not in it)
+  # webui: all of them in one get-config-objects request
+  # config-api (TF_API_BACKEND=config-api or config_api_only=True): list-bulk-collection with obj_uuids, for each type
+  ##
+  def get_objects(self, items, fields=None, config_api_only=False):
+    uuids = {}
+    for obj_type, uuid in items:
+      obj_type = obj_type.replace('_', '-')
+      if not uuid in uuids.setdefault(obj_type, []):
+        uuids[obj_type].append(uuid)
+    objs = {}
+    if uuids == {}:
+      return objs
+
+    if config_api_only or all([get_api_backend(obj_type) == 'config-api' for obj_type in uuids]):
+      chunks = []
+      for obj_type in sorted(uuids):
+        for i in range(0, len(uuids[obj_type]), BULK_RESOLVE_PARENTS):
+          chunks.append((obj_type, uuids[obj_type][i:i + BULK_RESOLVE_PARENTS]))
+      def get_chunk(chunk):
+        kwargs = {"detail": True, "obj_uuids": ",".join(chunk[1])}
+        if fields:
+          kwargs["fields"] = ",".join(fields)
+        found = []
+        for page in self.iter_pages(chunk[0], **kwargs):
+          found.extend(page)
+        return [obj.get(chunk[0], obj) if len(obj) == 1 else obj for obj in found]
+      for found in run_in_parallel(self.module, get_chunk, chunks):
+        for obj in found:
+          objs[obj.get("uuid")] = obj
+      return objs
+
+    data = [{"type": obj_type, "uuid": uuids[obj_type]} for obj_type in sorted(uuids)]
+    response = self.web_api_request('POST', 'api/tenants/config/get-config-objects', data=json.dumps({"data": data}), read=True)
+    if not response.status_code == 200:
+      fail_json(self.module, "cannot obtain {} object detail".format(", ".join(sorted(uuids))), message=response.text)
+    for entry in response_json(response):
+      for obj in entry.values():
+        objs[obj.get("uuid")] = obj
+    return objs
+
+  ##
+  # write-through: client.remember () when an object is created, client.forget () when it is deleted
+  ##
+  def remember(self, obj_type, fq_name, uuid):
+    obj_type = obj_type.replace('_', '-')
+    with self.fqname_cache_lock:
+      self.fqname_cache[(obj_type, tuple(fq_name))] = uuid
+    if not self.fqname_store == None:
+      self.fqname_store.put(obj_type, list(fq_name), uuid)
+
+  def forget(self, uuid):
+    with self.fqname_cache_lock:
+      for key in [key for key in self.fqname_cache if self.fqname_cache[key] == uuid]:
+        del self.fqname_cache[key]
+    if not self.fqname_store == None:
+      self.fqname_store.delete_uuid(uuid)
+    if not self.object_store == None:
+      self.object_store.delete_uuid(uuid)
+
+  def _on_config_api_write(self, method, path, data, response):
+    try:
+      if method == 'DELETE' and '/' in path:
+        self.forget(path.split('/')[1])
+      elif method == 'POST' and not '/' in path and not path in READ_ONLY_POSTS:
+        # e.g. POST virtual-networks {"virtual-network": {"fq_name": [...], ...}}
+        obj_type, obj = list(json.loads(data).items())[0]
+        uuid = list(response_json(response).values())[0].get("uuid")
+        if obj.get("fq_name") and uuid:
+          self.remember(obj_type, obj["fq_name"], uuid)
+    except (ValueError, TypeError, AttributeError, IndexError):
+      pass
+
+  ##
+  # client.web_api_request ('POST', 'api/tenants/config/create-config-object', data=payload)
+  ##
+  def web_api_request(self, method, path, data=None, read=False):
+    self.web_api_login()
+    try:
+      return governor.call(lambda: self.session.request(method, self.web_api_url + path, data=data, headers=self.web_api_headers, verify=False, timeout=HTTP_TIMEOUT), method, read=read)
+    except (IOError, OSError) as e:
+      fail_json(self.module, "webui is not reachable: {}".format(e))
+
+
+##
+# fq_name of the object which modules create, e.g.
+# get_fq_name ('virtual-network', 'vn1', domain='default-domain', project='admin') -> ['default-domain', 'admin', 'vn1']
+##
+def get_fq_name(obj_type, name, domain='default-domain', project='default-project', fabric='dummy', physical_router='dummy', loadbalancer_pool='dummy'):
+  if (obj_type in ['global-system-config']):
+    return ["default-global-system-config"]
+  elif (obj_type in ['virtual-machine'] or (obj_type == 'tag' and project == None)):
+    return [name]
+  elif (obj_type in ['global-vrouter-config']):
+    return ["default-global-system-config", "default-global-vrouter-config"]
+  elif (obj_type in ['bgp-router']):
+    return ["default-domain", "default-project", "ip-fabric", "__default__", name]
+  elif (obj_type in ['fabric', 'api-access-list']):
+    return ["default-global-system-config", name]
+  elif (obj_type in ['virtual-port-group']):
+    return ["default-global-system-config", fabric, name]
+  elif (obj_type in ['physical-interface']):
+    return ["default-global-system-config", physical_router, name]
+  elif (obj_type in ['application-policy-set', 'firewall-rule', 'firewall-policy'] and project == None):
+    return ["default-policy-management", name]
+  elif (obj_type in ['service-template']):
+    return [domain, name]
+  elif (obj_type in ['loadbalancer-member']):
+    return [domain, project, loadbalancer_pool, name]
+  else:
+    return [domain, project, name]
+
+
+##
+# login_and_check_id (module, name, obj_type, controller_ip, username, password, state, domain=domain, project=project)
+#
+# webui login is done in background while keystone and fqname-to-id are requested, or when the first webui request is sent (client.web_api_request).
+# modules which only use config-api can set config_api_only=True, then the object is also fetched from config-api.
+# refs=[(obj_type, fq_name), ...]: referenced objects are checked up front, and module fails with all the missing ones.
+##
+def login_and_check_id(module, name, obj_type, controller_ip, username, password, state, domain='default-domain', project='default-project', fabric='dummy', physical_router='dummy', loadbalancer_pool='dummy', config_api_only=False, refs=None, fields=None):
+    client = TFClient(module, controller_ip, username, password)
+
+    ## with fields, existing object is fetched and updated with config-api, since webui always returns the whole object
+    if fields and obj_type in WEB_UI_ONLY_TYPES:
+      fields = None
+
+    ## webui login doesn't depend on keystone and fqname-to-id, so start it now when webui will surely be used
+    if not (get_api_backend(obj_type) == 'config-api' or config_api_only or fields) and (state == 'present' or obj_type == 'api-access-list'):
+      client.web_api_login_start()
+
+    client.keystone_login()
+
+    ## check referenced objects before anything else is done
+    if refs and state == 'present':
+      missing = client.prefetch(refs)
+      if not missing == []:
+        fail_json(module, "referenced objects don't exist: {}".format(", ".join([m["type"] + " " + ":".join(m["fq_name"]) for m in missing])), missing=missing)
+
+    ## check if the fqname exists
+    fq_name = get_fq_name(obj_type, name, domain=domain, project=project, fabric=fabric, physical_router=physical_router, loadbalancer_pool=loadbalancer_pool)
+    client.target = (obj_type, fq_name)
+    uuid = client.resolve(obj_type, fq_name)
+    if uuid == None:
       update = False
       uuid=''
-    elif response.status_code == 401:
-      module.fail_json("config-api's /fqname-to-id access is not authorized. please check keystone client env, such as OS_AUTH_URL.")
     else:
-      module.fail_json("config-api's /fqname-to-id failed.")
+      update = True
 
-    ## login to web API
-    web_api = requests.session()
-    response = web_api.post(web_api_url + 'authenticate', data=json.dumps({"username": username, "password": password}), headers=web_api_headers, verify=False)
-    csrftoken=web_api.cookies['_csrf']
-    web_api_headers["x-csrf-token"]=csrftoken
+    if get_api_backend(obj_type) == 'config-api' or config_api_only or (fields and update):
+      js={}
+      if update and (state=='present' or obj_type == 'api-access-list'):
+        js = client.get_object(obj_type, uuid, fields=fields)
+        if js == None:
+          fail_json(module, "cannot obtain {} object detail".format(obj_type))
+        client.projected = bool(fields)
+        client.live = copy.deepcopy(js)
+      return (client, update, uuid, js)
 
     js={}
     if update and (state=='present' or obj_type == 'api-access-list'):
-      response = web_api.post(web_api_url + 'api/tenants/config/get-config-objects', data=json.dumps({"data": [{"type": obj_type, "uuid": ["{}".format(uuid)]}]}), headers=web_api_headers, verify=False)
-      js = json.loads(response.text)[0]
+      response = client.web_api_request('POST', 'api/tenants/config/get-config-objects', data=json.dumps({"data": [{"type": obj_type, "uuid": ["{}".format(uuid)]}]}), read=True)
+      js = response_json(response)[0]
+      client.live = copy.deepcopy(js)
+
+    return (client, update, uuid, js)
+
+
+##
+# normalizing diff of the payload and the fetched object
+#
+# object_diff ('virtual-network', js, client.live) -> ['route_target_list', ...]
+#
+# returns fields of the payload which would change the object:
+# - fields which are not in the payload are not compared (update doesn't change them)
+# - keys which only the fetched object has (href, rule_uuid etc) are ignored
+# - null, "", false, [] and {} in the payload are the same with missing ones (e.g. "tags": [], "any": null of firewall-rule)
+# - *_refs are compared regardless of their order, and by "to" or "uuid" which the payload has
+# - scalars are compared as text, so 100 and "100" are the same
+##
+def _is_empty(value):
+  if isinstance(value, dict):
+    return all([_is_empty(v) for v in value.values()])
+  return value == None or value is False or value == '' or value == []
+
+def _matches(desired, live, unordered=False):
+  if live == None or _is_empty(desired):
+    return _is_empty(desired) and _is_empty(live)
+  if isinstance(desired, dict):
+    if not isinstance(live, dict):
+      return False
+    return all([_matches(v, live.get(k), unordered=k.endswith('_refs')) for k, v in desired.items()])
+  if isinstance(desired, list):
+    if not isinstance(live, list) or not len(desired) == len(live):
+      return False
+    if not unordered:
+      return all([_matches(d, l) for d, l in zip(desired, live)])
+    rest = list(live)
+    for d in desired:
+      if isinstance(d, dict) and d.get("uuid"):
+        # uuid is enough to identify the referred object
+        d = dict([(k, v) for k, v in d.items() if not k == 'to'])
+      for i in range(len(rest)):
+        if _matches(d, rest[i]):
+          del rest[i]
+          break
+      else:
+        return False
+    return True
+  if isinstance(live, (dict, list)):
+    return False
+  if desired == live:
+    return True
+  if isinstance(desired, bool) or isinstance(live, bool):
+    # module parameters might give booleans as 'True' / 'true'
+    return to_text(desired).lower() == to_text(live).lower()
+  return to_text(desired) == to_text(live)
+
+def object_diff(obj_type, desired, live):
+  desired = (desired or {}).get(obj_type) or {}
+  live = (live or {}).get(obj_type) or {}
+  return sorted([k for k, v in desired.items() if not (k in WEB_UI_ONLY_FIELDS or k.endswith('_back_refs')) and not _matches(v, live.get(k), unordered=k.endswith('_refs'))])
+
+
+##
+# read-only plan of the change, for check mode and --diff
+#
+# plan_change (client, result, state, update, obj_type, uuid, desired=js)
+#
+# result["plan"] is {"action": "create" / "update" / "delete" / "none", "type", "fq_name", "uuid", "fields"},
+# and result["diff"] has before / after of those fields, when --diff is given.
+# returns the action. action can be given for the modules which run jobs instead of writing the object
+##
+def plan_change(client, result, state, update, obj_type, uuid, desired=None, action=None):
+  desired_obj = (desired or {}).get(obj_type) or {}
+  live_obj = (client.live or {}).get(obj_type) or {}
+  fields = []
+  if state == 'present' or obj_type == 'api-access-list':
+    if update:
+      fields = object_diff(obj_type, desired, client.live) if not client.live == None else sorted(desired_obj)
+      default_action = 'update' if fields else 'none'
+    else:
+      fields = sorted([k for k in desired_obj if not k in WEB_UI_ONLY_FIELDS])
+      default_action = 'create'
+  else:
+    default_action = 'delete' if update else 'none'
+  if action == None:
+    action = default_action
+
+  fq_name = None if client.target == None else client.target[1]
+  if getattr(client.module, 'check_mode', False):
+    # in a real run, changed is set by the write (or the job) itself
+    result["changed"] = not action == 'none'
+  result["plan"] = {"action": action, "type": obj_type, "fq_name": fq_name, "uuid": uuid or None, "fields": fields}
+  if getattr(client.module, '_diff', False):
+    before = {}
+    after = {}
+    if default_action == 'update':
+      before = dict([(k, live_obj.get(k)) for k in fields])
+      after = dict([(k, desired_obj.get(k)) for k in fields])
+    elif default_action == 'create':
+      after = dict([(k, desired_obj.get(k)) for k in fields])
+    elif default_action == 'delete':
+      before = {"fq_name": fq_name, "uuid": uuid}
+    name = "{} {}".format(obj_type, ":".join(fq_name or []))
+    result["diff"] = {"before": before, "after": after, "before_header": name, "after_header": name}
+  return action
 
-    return (web_api, update, uuid, js)
+
+def plan_message(obj_type, action):
+  if action == 'none':
+    return "{} is up to date".format(obj_type)
+  if action in ['create', 'update', 'delete']:
+    return "{} would be {}d".format(obj_type, action)
+  return "{} would run {}".format(obj_type, action)
+
+##
+# check_mode_plan (client, result, state, update, obj_type, uuid, desired=js)
+#
+# for the modules which write objects without crud: call this just before writing.
+# plan (and diff) is set to result with check mode or --diff, and module exits here with check mode
+##
+def check_mode_plan(client, result, state, update, obj_type, uuid, desired=None, action=None):
+  module = client.module
+  if not (module.check_mode or getattr(module, '_diff', False)):
+    return
+  action = plan_change(client, result, state, update, obj_type, uuid, desired=desired, action=action)
+  if module.check_mode:
+    result["message"] = plan_message(obj_type, action)
+    module.exit_json(**result)
 
 
 ##
-# crud (web_api, 'present', result, payload)
-# crud (web_api, 'absent', result, obj_type='virtual-network', uuid='xxxx-xxxx')
+# crud (client, controller_ip, update, 'present', result, payload)
+# crud (client, controller_ip, update, 'absent', result, obj_type='virtual-network', uuid='xxxx-xxxx')
 ##
-def crud(web_api, controller_ip, update, state, result, payload='{}', obj_type='', uuid='', userData={}):
-    web_api_url = 'https://' + controller_ip + ':8143/'
+def crud(client, controller_ip, update, state, result, payload='{}', obj_type='', uuid='', userData={}):
+    # webui url is the one which login_and_check_id logged in
     failed=False
 
-    csrftoken=web_api.cookies['_csrf']
-    vnc_api_headers["x-csrf-token"]=csrftoken
+    ## check mode: only the plan is returned, and nothing is written
+    module = client.module
+    if getattr(module, 'check_mode', False) or getattr(module, '_diff', False):
+      action = plan_change(client, result, state, update, obj_type, uuid, desired=json.loads(payload))
+      if module.check_mode and (update or state == "present" or obj_type == 'api-access-list'):
+        result["message"] = plan_message(obj_type, action)
+        return False
+
+    ## nothing to write, when the payload doesn't change the fetched object
+    if update and state == "present" and not client.live == None:
+      if object_diff(obj_type, json.loads(payload), client.live) == []:
+        result["changed"] = False
+        result["message"] = "{} is up to date".format(obj_type)
+        return False
+
+    if get_api_backend(obj_type) == 'config-api' or (update and client.projected):
+      return crud_config_api(client, update, state, result, payload=payload, obj_type=obj_type, uuid=uuid)
 
     if state == "present" or obj_type == 'api-access-list':
       if update:
         print ("update object")
 
         if obj_type == 'service-instance':
-          response = web_api.put(web_api_url + 'api/tenants/config/service-instances/' + uuid, data=payload, headers=web_api_headers, verify=False)
+          response = client.web_api_request('PUT', 'api/tenants/config/service-instances/' + uuid, data=payload)
         else:
-          response = web_api.post(web_api_url + 'api/tenants/config/update-config-object', data=payload, headers=web_api_headers, verify=False)
+          response = client.web_api_request('POST', 'api/tenants/config/update-config-object', data=payload)
       else:
         print ("create object")
         if obj_type == 'service-instance':
-          response = web_api.post(web_api_url + 'api/tenants/config/service-instances', data=payload, headers=web_api_headers, verify=False)
+          response = client.web_api_request('POST', 'api/tenants/config/service-instances', data=payload)
         elif obj_type == 'loadbalancer':
-          response = web_api.post(web_api_url + 'api/tenants/config/lbaas/load-balancer', data=payload, headers=web_api_headers, verify=False)
+          response = client.web_api_request('POST', 'api/tenants/config/lbaas/load-balancer', data=payload)
         else:
-          response = web_api.post(web_api_url + 'api/tenants/config/create-config-object', data=payload, headers=web_api_headers, verify=False)
+          response = client.web_api_request('POST', 'api/tenants/config/create-config-object', data=payload)
     elif (state == "absent"):
       if update:
         print ("delete object {}".format(uuid))
         if obj_type == 'loadbalancer':
-          response = web_api.post(web_api_url + 'api/tenants/config/lbaas/load-balancer/delete', data=json.dumps({"uuids": [uuid]}), headers=web_api_headers, verify=False)
+          response = client.web_api_request('POST', 'api/tenants/config/lbaas/load-balancer/delete', data=json.dumps({"uuids": [uuid]}))
         else:
           delete_data=[{"type": obj_type, "deleteIDs": ["{}".format(uuid)]}]
           if not userData == {}:
             delete_data[0]["userData"]=userData
-          response = web_api.post(web_api_url + 'api/tenants/config/delete', data=json.dumps(delete_data), headers=web_api_headers, verify=False)
+          response = client.web_api_request('POST', 'api/tenants/config/delete', data=json.dumps(delete_data))
       else:
         result["message"]="delete is requested, but that fq_name is not avaialbe"
         result["changed"]=False
@@ -140,6 +1603,13 @@ def crud(web_api, controller_ip, update, state, result, payload='{}', obj_type='
 
     if response.status_code == 200:
       result['changed'] = True
+      ## keep fq_name cache up to date
+      if state == "absent":
+        client.forget(uuid)
+      elif not update and not client.target == None:
+        created_uuid = get_created_uuid(message)
+        if created_uuid:
+          client.remember(client.target[0], client.target[1], created_uuid)
     else:
       result['changed'] = False
       failed = True
@@ -149,15 +1619,55 @@ def crud(web_api, controller_ip, update, state, result, payload='{}', obj_type='
     return failed
 
 
-def fqname_to_id (module, fqname, obj_type, controller_ip):
-  config_api_url = 'http://' + controller_ip + ':8082/'
-  if (type(fqname) == str):
-    fqname_list = fqname.split (":")
-  else:
-    fqname_list = fqname
+##
+# uuid of created object, from webui's response such as [{"virtual-network": {"uuid": "xxxx-xxxx", ...}}]
+##
+def get_created_uuid(text):
+  try:
+    js = json.loads(text)
+    if isinstance(js, list):
+      js = js[0]
+    return list(js.values())[0].get("uuid")
+  except (ValueError, TypeError, AttributeError, IndexError):
+    return None
+
+
+##
+# crud_config_api (client, update, 'present', result, payload, obj_type='virtual-network', uuid='xxxx-xxxx')
+# same with crud, but requests are directly sent to config-api
+##
+def crud_config_api(client, update, state, result, payload='{}', obj_type='', uuid=''):
+    failed=False
+
+    if state == "present" or obj_type == 'api-access-list':
+      if update:
+        response = client.config_api.put(obj_type + '/' + uuid, data=config_api_payload(payload, obj_type))
+      else:
+        response = client.config_api.post(obj_type + 's', data=config_api_payload(payload, obj_type))
+    elif (state == "absent"):
+      if update:
+        response = client.config_api.delete(obj_type + '/' + uuid)
+      else:
+        result["message"]="delete is requested, but that fq_name is not avaialbe"
+        result["changed"]=False
+        return True
+
+    if response.status_code == 200:
+      result['changed'] = True
+    else:
+      result['changed'] = False
+      failed = True
+
+    result['message'] = response.text
+
+    return failed
+
 
-  response = requests.post(config_api_url + 'fqname-to-id', data=json.dumps({"type": obj_type, "fq_name": fqname_list}), headers=vnc_api_headers)
-  if not response.status_code == 200:
-    module.fail_json(msg="{} specified doesn't exist".fqname, **result)
-  uuid = json.loads(response.text).get("uuid")
+##
+# fqname_to_id (client, 'default-domain:admin:vn1', 'virtual-network')
+##
+def fqname_to_id (client, fqname, obj_type):
+  uuid = client.resolve(obj_type, fqname)
+  if uuid == None:
+    fail_json(client.module, "{} {} specified doesn't exist".format(obj_type, fqname if isinstance(fqname, string_types) else ":".join(fqname)))
   return uuid
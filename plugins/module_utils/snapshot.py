@@ -0,0 +1,145 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+import os
+import json
+import time
+
+try:
+  import sqlite3
+  HAS_SQLITE3 = True
+except ImportError:
+  HAS_SQLITE3 = False
+
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import get_cache_dir
+
+
+##
+# local snapshot of config-api objects (sqlite), which is written by tf_snapshot module
+#
+# objects: uuid, type, fq_name (json), parent_type, parent_uuid, last_modified, body (json)
+# refs: from_uuid, from_type, to_uuid, to_type, attr (json). one row for each reference, from the referrer to the referred object
+# meta: controller, created_at, types
+##
+SNAPSHOT_SCHEMA = [
+  'CREATE TABLE objects (uuid TEXT PRIMARY KEY, type TEXT, fq_name TEXT, parent_type TEXT, parent_uuid TEXT, last_modified TEXT, body TEXT)',
+  'CREATE INDEX objects_fq_name ON objects (type, fq_name)',
+  'CREATE INDEX objects_parent ON objects (parent_uuid)',
+  'CREATE TABLE refs (from_uuid TEXT, from_type TEXT, to_uuid TEXT, to_type TEXT, attr TEXT)',
+  'CREATE UNIQUE INDEX refs_from ON refs (from_uuid, to_uuid)',
+  'CREATE INDEX refs_to ON refs (to_uuid)',
+  'CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)',
+]
+
+def get_snapshot_path(path=None):
+  if path:
+    return os.path.expanduser(path)
+  return os.getenv('TF_SNAPSHOT', os.path.join(get_cache_dir(), 'snapshot.db'))
+
+def _unwrap(obj_type, obj):
+  # list-bulk-collection with detail=True might return {"virtual-network": {...}} for each object
+  if len(obj) == 1 and obj_type in obj:
+    return obj[obj_type]
+  return obj
+
+# refs of the object, and its back_refs reversed (from the referrer to this object)
+def _edges(obj_type, obj, back_refs=False):
+  for key in obj:
+    if key.endswith('_back_refs'):
+      if back_refs:
+        from_type = key[:-len('_back_refs')].replace('_', '-')
+        for ref in obj.get(key) or []:
+          yield (ref.get("uuid"), from_type, obj.get("uuid"), obj_type, json.dumps(ref.get("attr")))
+    elif key.endswith('_refs') and not back_refs:
+      to_type = key[:-len('_refs')].replace('_', '-')
+      for ref in obj.get(key) or []:
+        yield (obj.get("uuid"), obj_type, ref.get("uuid"), to_type, json.dumps(ref.get("attr")))
+
+
+##
+# writer = SnapshotWriter (path, controller_ip)
+# writer.add ('virtual-network', objs)
+# writer.close ()
+#
+# snapshot is written to a temporary file, and replaced at once when it is closed
+##
+class SnapshotWriter(object):
+  def __init__(self, path, controller):
+    self.path = path
+    self.tmp_path = "{}.{}".format(path, os.getpid())
+    if os.path.exists(self.tmp_path):
+      os.remove(self.tmp_path)
+    self.db = sqlite3.connect(self.tmp_path)
+    for sql in SNAPSHOT_SCHEMA:
+      self.db.execute(sql)
+    self.controller = controller
+    self.counts = {}
+
+  def add(self, obj_type, objs):
+    objs = [_unwrap(obj_type, obj) for obj in objs]
+    self.db.executemany('INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?, ?, ?, ?)', [
+      (obj.get("uuid"), obj_type, json.dumps(obj.get("fq_name")), obj.get("parent_type"), obj.get("parent_uuid"), (obj.get("id_perms") or {}).get("last_modified"), json.dumps(obj))
+      for obj in objs])
+    for obj in objs:
+      # the same reference can be seen from both sides: the referrer's refs win over back_refs
+      self.db.executemany('INSERT OR REPLACE INTO refs VALUES (?, ?, ?, ?, ?)', list(_edges(obj_type, obj)))
+      self.db.executemany('INSERT OR IGNORE INTO refs VALUES (?, ?, ?, ?, ?)', list(_edges(obj_type, obj, back_refs=True)))
+    self.counts[obj_type] = self.counts.get(obj_type, 0) + len(objs)
+
+  def close(self):
+    meta = {"controller": self.controller, "created_at": str(time.time()), "types": json.dumps(sorted(self.counts))}
+    self.db.executemany('INSERT OR REPLACE INTO meta VALUES (?, ?)', list(meta.items()))
+    self.db.commit()
+    self.db.close()
+    os.chmod(self.tmp_path, 0o600)
+    os.rename(self.tmp_path, self.path)
+
+  def abort(self):
+    self.db.close()
+    os.remove(self.tmp_path)
+
+
+##
+# snapshot = Snapshot (path)
+# snapshot.resolve ('virtual-network', ['default-domain', 'admin', 'vn1'])
+# snapshot.refs (uuid), snapshot.back_refs (uuid), snapshot.children (uuid)
+##
+class Snapshot(object):
+  def __init__(self, path):
+    if not os.path.exists(path):
+      raise IOError("snapshot {} doesn't exist".format(path))
+    self.db = sqlite3.connect(path)
+
+  def meta(self):
+    return dict(self.db.execute('SELECT key, value FROM meta').fetchall())
+
+  def resolve(self, obj_type, fq_name):
+    row = self.db.execute('SELECT uuid FROM objects WHERE type = ? AND fq_name = ?', (obj_type, json.dumps(list(fq_name)))).fetchone()
+    if row == None:
+      return None
+    return row[0]
+
+  def get(self, uuid):
+    row = self.db.execute('SELECT body FROM objects WHERE uuid = ?', (uuid,)).fetchone()
+    if row == None:
+      return None
+    return json.loads(row[0])
+
+  # objects which this object refers to
+  def refs(self, uuid):
+    return [{"uuid": to_uuid, "type": to_type, "attr": json.loads(attr)} for to_uuid, to_type, attr in
+      self.db.execute('SELECT to_uuid, to_type, attr FROM refs WHERE from_uuid = ?', (uuid,)).fetchall()]
+
+  # objects which refer to this object
+  def back_refs(self, uuid):
+    return [{"uuid": from_uuid, "type": from_type, "attr": json.loads(attr)} for from_uuid, from_type, attr in
+      self.db.execute('SELECT from_uuid, from_type, attr FROM refs WHERE to_uuid = ?', (uuid,)).fetchall()]
+
+  def children(self, uuid):
+    return [{"uuid": child_uuid, "type": child_type, "fq_name": json.loads(fq_name)} for child_uuid, child_type, fq_name in
+      self.db.execute('SELECT uuid, type, fq_name FROM objects WHERE parent_uuid = ?', (uuid,)).fetchall()]
+
+  def close(self):
+    self.db.close()
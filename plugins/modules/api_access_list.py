@@ -23,7 +23,7 @@ description:
 options:
     controller_ip:
         description:
-            - tungstenfabric controller ip
+            - tungstenfabric controller ip (comma separated list, when there are multiple controllers)
         required: true
 
 author:
@@ -87,7 +87,6 @@ message:
 
 import sys
 import json
-import requests
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud
 
@@ -133,12 +132,9 @@ def run_module():
     role_crud_list = module.params.get("role_crud_list")
     role_name_list = module.params.get("role_name_list")
 
-    if module.check_mode:
-        module.exit_json(**result)
-
     obj_type='api-access-list'
 
-    (web_api, update, uuid, js) = login_and_check_id(module, name, obj_type, controller_ip, username, password, state, domain=domain, project=project)
+    (client, update, uuid, js) = login_and_check_id(module, name, obj_type, controller_ip, username, password, state, domain=domain, project=project)
 
     if update:
       pass
@@ -173,7 +169,7 @@ def run_module():
 
     payload=json.dumps(js)
 
-    failed = crud (web_api, controller_ip, update, state, result, payload=payload, obj_type=obj_type, uuid=uuid)
+    failed = crud (client, controller_ip, update, state, result, payload=payload, obj_type=obj_type, uuid=uuid)
 
 
     if failed:
@@ -27,7 +27,7 @@ options:
         required: true
     controller_ip:
         description:
-            - tungstenfabric controller ip
+            - tungstenfabric controller ip (comma separated list, when there are multiple controllers)
         required: true
     project:
         description:
@@ -70,9 +70,8 @@ message:
 
 import sys
 import json
-import requests
 from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud, vnc_api_headers
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud
 
 def run_module():
     module_args = dict(
@@ -110,15 +109,10 @@ def run_module():
     project = module.params.get("project")
     firewall_policies = module.params.get("firewall_policies")
 
-    if module.check_mode:
-        module.exit_json(**result)
-
-
-    config_api_url = 'http://' + controller_ip + ':8082/'
-
     obj_type='application-policy-set'
 
-    (web_api, update, uuid, js) = login_and_check_id(module, name, obj_type, controller_ip, username, password, state, domain=domain, project=project)
+    refs = [("firewall-policy", [domain, project, firewall_policy] if project else ["default-policy-management", firewall_policy]) for firewall_policy in (firewall_policies or [])]
+    (client, update, uuid, js) = login_and_check_id(module, name, obj_type, controller_ip, username, password, state, domain=domain, project=project, refs=refs)
 
     if update and state=='present':
       pass
@@ -150,17 +144,17 @@ def run_module():
     ## begin: object specific
     if (firewall_policies):
       firewall_policy_refs = []
+      if project:
+        firewall_policy_fqnames = [[domain, project, firewall_policy_name] for firewall_policy_name in firewall_policies]
+      else:
+        firewall_policy_fqnames = [["default-policy-management", firewall_policy_name] for firewall_policy_name in firewall_policies]
+      # get uuid of all firewall policies
+      firewall_policy_uuids = client.resolve_many("firewall-policy", firewall_policy_fqnames)
       for i in range(len(firewall_policies)):
-        # get uuid of each firewall rule
-        firewall_policy_name = firewall_policies[i]
-        if project:
-          firewall_policy_fqname = [domain, project, firewall_policy_name]
-        else:
-          firewall_policy_fqname = ["default-policy-management", firewall_policy_name]
-        response = requests.post(config_api_url + 'fqname-to-id', data=json.dumps({"type": "firewall-policy", "fq_name": firewall_policy_fqname}), headers=vnc_api_headers)
-        if not response.status_code == 200:
+        firewall_policy_fqname = firewall_policy_fqnames[i]
+        firewall_policy_uuid = firewall_policy_uuids[i]
+        if firewall_policy_uuid == None:
           module.fail_json(msg="specified firewall-policy doesn't exist", **result)
-        firewall_policy_uuid = json.loads(response.text).get("uuid")
         firewall_policy_refs.append({"attr": {"sequence": "{}".format(i)}, "to": firewall_policy_fqname, "uuid": firewall_policy_uuid})
       js["application-policy-set"]["firewall_policy_refs"] = firewall_policy_refs
     ## end: object specific
@@ -168,7 +162,7 @@ def run_module():
 
     payload=json.dumps(js)
 
-    failed = crud (web_api, controller_ip, update, state, result, payload=payload, obj_type=obj_type, uuid=uuid)
+    failed = crud (client, controller_ip, update, state, result, payload=payload, obj_type=obj_type, uuid=uuid)
 
 
     if failed:
@@ -27,7 +27,7 @@ options:
         required: true
     controller_ip:
         description:
-            - tungstenfabric controller ip
+            - tungstenfabric controller ip (comma separated list, when there are multiple controllers)
         required: true
     domain:
         description:
@@ -80,7 +80,6 @@ message:
 
 import sys
 import json
-import requests
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud
 
@@ -125,12 +124,10 @@ def run_module():
     autonomous_system = module.params.get("autonomous_system")
     bgp_router_refs = module.params.get("bgp_router_refs")
 
-    if module.check_mode:
-        module.exit_json(**result)
-
     obj_type='bgp-router'
 
-    (web_api, update, uuid, js) = login_and_check_id(module, name, obj_type, controller_ip, username, password, state)
+    refs = [("bgp-router", ["default-domain", "default-project", "ip-fabric", "__default__", bgp_router]) for bgp_router in (bgp_router_refs or [])]
+    (client, update, uuid, js) = login_and_check_id(module, name, obj_type, controller_ip, username, password, state, refs=refs)
 
     if update and state=='present':
       pass
@@ -178,7 +175,7 @@ def run_module():
 
     payload=json.dumps(js)
 
-    failed = crud (web_api, controller_ip, update, state, result, payload=payload, obj_type=obj_type, uuid=uuid)
+    failed = crud (client, controller_ip, update, state, result, payload=payload, obj_type=obj_type, uuid=uuid)
 
 
     if failed:
@@ -23,7 +23,7 @@ description:
 options:
     controller_ip:
         description:
-            - tungstenfabric controller ip
+            - tungstenfabric controller ip (comma separated list, when there are multiple controllers)
         required: true
     domain:
         description:
@@ -76,9 +76,8 @@ message:
 
 import sys
 import json
-import requests
 from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud, vnc_api_headers
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud
 
 def run_module():
     module_args = dict(
@@ -111,21 +110,28 @@ def run_module():
     fabric = module.params.get("fabric")
     vpg_vn_vlan_list = module.params.get("vpg_vn_vlan_list")
 
-    if module.check_mode:
-        module.exit_json(**result)
-
 
     ## begin: object specific
-    config_api_url = 'http://' + controller_ip + ':8082/'
 
     failed=False
 
     obj_type='virtual-port-group'
 
     # for keystone login
-    (web_api, update, uuid, js) = login_and_check_id(module, name, obj_type, controller_ip, username, password, state, domain=domain, project=project, fabric=fabric)
+    refs = [("virtual-port-group", ["default-global-system-config", fabric, vpg_vn_vlan[0]]) for vpg_vn_vlan in vpg_vn_vlan_list] + [("virtual-network", [domain, project, vpg_vn_vlan[1]]) for vpg_vn_vlan in vpg_vn_vlan_list]
+    (client, update, uuid, js) = login_and_check_id(module, name, obj_type, controller_ip, username, password, state, domain=domain, project=project, fabric=fabric, config_api_only=True, refs=refs)
+    config_api = client.config_api
+
+    ## get all the vpgs at once (vpg and vn uuids are already resolved by login_and_check_id)
+    vpg_names = sorted(set([vpg_vn_vlan[0] for vpg_vn_vlan in vpg_vn_vlan_list]))
+    vpg_uuids = dict([(vpg_name, client.resolve("virtual-port-group", ["default-global-system-config", fabric, vpg_name])) for vpg_name in vpg_names])
+    vpg_objs = client.get_objects([("virtual-port-group", vpg_uuid) for vpg_uuid in vpg_uuids.values() if not vpg_uuid == None], fields=["virtual_machine_interface_refs", "physical_interface_refs"], config_api_only=True)
 
 
+    # vmis which will be created / deleted, for check mode and --diff
+    plans = []
+    diffs = []
+
     for i in range(len(vpg_vn_vlan_list)):
       native_vlan = None
       vpg_name, vn_name, vlan_id = vpg_vn_vlan_list[i][0:3]
@@ -133,24 +139,16 @@ def run_module():
         native_vlan = vpg_vn_vlan_list[i][3]
 
       ## check if the vpg exists
-      response = requests.post(config_api_url + 'fqname-to-id', data='{"type": "virtual-port-group", "fq_name": ["default-global-system-config", "%s", "%s"]}' % (fabric, vpg_name), headers=vnc_api_headers)
-      if response.status_code == 200:
-        tmp = json.loads(response.text)
-        vpg_uuid = tmp.get("uuid")
-
-        response = requests.get(config_api_url + 'virtual-port-group/' + vpg_uuid, headers=vnc_api_headers)
-        vpg_vmi_refs = json.loads(response.text).get("virtual-port-group").get("virtual_machine_interface_refs")
-        physical_interface_refs = json.loads(response.text).get("virtual-port-group").get("physical_interface_refs")
-
-        if response.status_code == 200:
-          pass
+      vpg_uuid = vpg_uuids[vpg_name]
+      if not vpg_uuid == None:
+        if vpg_uuid in vpg_objs:
+          vpg_vmi_refs = vpg_objs[vpg_uuid].get("virtual_machine_interface_refs") or []
+          physical_interface_refs = vpg_objs[vpg_uuid].get("physical_interface_refs") or []
         else:
           failed = True
-          result["message"] = response.text
           module.fail_json(msg="cannot get vpg detail", **result)
       else:
         failed = True
-        result["message"] = response.text
         module.fail_json(msg="cannot assign / delete vlan-id / vn pair, since vpg is not available", **result)
 
       if state == 'present':
@@ -160,12 +158,9 @@ def run_module():
         # skip this if already available
 
         # check virtual-network uuid
-        response = requests.post(config_api_url + 'fqname-to-id', data='{"type": "virtual-network", "fq_name": ["%s", "%s", "%s"]}' % (domain, project, vn_name), headers=vnc_api_headers)
-        if response.status_code == 200:
-          vn_uuid = json.loads(response.text).get("uuid")
-        else:
+        vn_uuid = client.resolve("virtual-network", [domain, project, vn_name])
+        if vn_uuid == None:
           failed = True
-          result["message"] = response.text
           module.fail_json(msg="cannot assign / delete vlan-id / vn pair, since vn is not available", **result)
 
         # local link information: please make them the same with vpg side definition, since this definition will update VPG pi refs ..
@@ -217,9 +212,15 @@ def run_module():
         # annotation or virtual_machine_interface_refs' attr
         # skip this if already available
 
-        response = requests.post(config_api_url + 'virtual-machine-interfaces', data=json.dumps(js), headers=vnc_api_headers)
+        vmi = js["virtual-machine-interface"]
+        plans.append({"action": "create", "type": "virtual-machine-interface", "fq_name": vmi["fq_name"], "uuid": None, "fields": sorted(vmi)})
+        diffs.append({"before": {}, "after": vmi, "before_header": ":".join(vmi["fq_name"]), "after_header": ":".join(vmi["fq_name"])})
+        if module.check_mode:
+          continue
+
+        response = config_api.post('virtual-machine-interfaces', data=json.dumps(js))
         if response.status_code == 200:
-          pass
+          result["changed"] = True
         elif response.status_code == 409:
           # something occurred for this vmi .., set it failed, and continue
           failed = True
@@ -243,12 +244,26 @@ def run_module():
           failed = True
           module.fail_json(msg="cannot find vmi_uuid to be deleted", **result)
 
+        plans.append({"action": "delete", "type": "virtual-machine-interface", "fq_name": None, "uuid": vmi_uuid, "fields": []})
+        diffs.append({"before": {"uuid": vmi_uuid}, "after": {}, "before_header": vmi_uuid, "after_header": vmi_uuid})
+        if module.check_mode:
+          continue
+
         # delete virtual-machine-interfaces
-        response = requests.delete(config_api_url + 'virtual-machine-interfaces/' + vmi_uuid, headers=vnc_api_headers)
+        response = config_api.delete('virtual-machine-interfaces/' + vmi_uuid)
         if not response.status_code == 200:
           failed = True
           result["message"] = response.text
           module.fail_json(msg="vn / vlan-id pair deletion failed", **result)
+        result["changed"] = True
+
+    if module.check_mode or module._diff:
+      result["plan"] = plans
+      if module._diff:
+        result["diff"] = diffs
+    if module.check_mode:
+      result["changed"] = not plans == []
+      result["message"] = "{} virtual-machine-interfaces would be {}d".format(len(plans), 'create' if state == 'present' else 'delete')
     ## end: object specific
 
 
@@ -27,7 +27,7 @@ options:
         required: true
     controller_ip:
         description:
-            - tungstenfabric controller ip
+            - tungstenfabric controller ip (comma separated list, when there are multiple controllers)
         required: true
     domain:
         description:
@@ -90,9 +90,8 @@ message:
 
 import sys
 import json
-import requests
 from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud, vnc_api_headers
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud, check_mode_plan
 
 def run_module():
     module_args = dict(
@@ -144,15 +143,14 @@ def run_module():
     overlay_ibgp_asn = module.params.get("overlay_ibgp_asn")
     enterprise_style = module.params.get("enterprise_style")
 
-    if module.check_mode:
-        module.exit_json(**result)
-
     obj_type='fabric'
 
-    (web_api, update, uuid, js) = login_and_check_id(module, name, obj_type, controller_ip, username, password, state, domain=domain, project=project)
+    (client, update, uuid, js) = login_and_check_id(module, name, obj_type, controller_ip, username, password, state, domain=domain, project=project, config_api_only=True)
+    config_api = client.config_api
+
+    check_mode_plan(client, result, state, update, obj_type, uuid, desired=js)
 
     ## begin: object specific
-    config_api_url = 'http://' + controller_ip + ':8082/'
     failed = False
 
     if update:
@@ -161,10 +159,12 @@ def run_module():
       elif state == 'absent':
         # delete fabric
         payload = {'job_template_fq_name': ['default-global-system-config', 'fabric_deletion_template'], "input": {'fabric_fq_name': ["default-global-system-config", name]}}
-        response = requests.post(config_api_url + 'execute-job', data=json.dumps(payload), headers=vnc_api_headers)
+        response = config_api.post('execute-job', data=json.dumps(payload))
         if not response.status_code == 200:
           failed = True
           result["message"] = response.text
+        else:
+          result["changed"] = True
     else:
       if state == 'present':
         management_subnets_dict= [{"cidr": management_subnet } for management_subnet in management_subnets]
@@ -183,10 +183,12 @@ def run_module():
           job_input["fabric_asn_pool"]=[{"asn_min": fabric_asn_pool[0], "asn_max": fabric_asn_pool[1]}]
 
         payload = {'job_template_fq_name': ['default-global-system-config', 'existing_fabric_onboard_template'], "input": job_input}
-        response = requests.post(config_api_url + 'execute-job', data=json.dumps(payload), headers=vnc_api_headers)
+        response = config_api.post('execute-job', data=json.dumps(payload))
         if not response.status_code == 200:
           failed = True
           result["message"] = response.text
+        else:
+          result["changed"] = True
       else:
         module.fail_json(msg='cannot reach here', **result)
     
@@ -27,7 +27,7 @@ options:
         required: true
     controller_ip:
         description:
-            - tungstenfabric controller ip
+            - tungstenfabric controller ip (comma separated list, when there are multiple controllers)
         required: true
     domain:
         description:
@@ -79,9 +79,8 @@ message:
 
 import sys
 import json
-import requests
 from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud, vnc_api_headers
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud, check_mode_plan
 
 def run_module():
     module_args = dict(
@@ -113,16 +112,15 @@ def run_module():
     project = module.params.get("project")
     dict_device_role = module.params.get("dict_device_role")
 
-    if module.check_mode:
-        module.exit_json(**result)
-
     obj_type='fabric'
 
-    (web_api, update, uuid, js) = login_and_check_id(module, name, obj_type, controller_ip, username, password, state, domain=domain, project=project)
+    (client, update, uuid, js) = login_and_check_id(module, name, obj_type, controller_ip, username, password, state, domain=domain, project=project, config_api_only=True)
+    config_api = client.config_api
+
+    check_mode_plan(client, result, state, update, obj_type, uuid, action='role-assignment' if update else 'none')
 
     ## begin: object specific
     failed=False
-    config_api_url = 'http://' + controller_ip + ':8082/'
     if update:
         role_assignment_list=[]
         for device_name in dict_device_role:
@@ -132,10 +130,12 @@ def run_module():
                        'role_assignments': role_assignment_list
                     }
         payload = {'job_template_fq_name': ['default-global-system-config', 'role_assignment_template'], "input": job_input}
-        response = requests.post(config_api_url + 'execute-job', data=json.dumps(payload), headers=vnc_api_headers)
+        response = config_api.post('execute-job', data=json.dumps(payload))
         if not response.status_code == 200:
           failed = True
           result["message"] = response.text
+        else:
+          result["changed"] = True
         ## TODO: wait_for for this job
     else:
         result["message"]="fabric {} doesn't exist".format(name)
@@ -27,7 +27,7 @@ options:
         required: true
     controller_ip:
         description:
-            - tungstenfabric controller ip
+            - tungstenfabric controller ip (comma separated list, when there are multiple controllers)
         required: true
     project:
         description:
@@ -74,9 +74,8 @@ message:
 
 import sys
 import json
-import requests
 from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud, vnc_api_headers
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud
 
 def run_module():
     module_args = dict(
@@ -114,15 +113,10 @@ def run_module():
     project = module.params.get("project")
     firewall_rules = module.params.get("firewall_rules")
 
-    if module.check_mode:
-        module.exit_json(**result)
-
-
-    config_api_url = 'http://' + controller_ip + ':8082/'
-
     obj_type='firewall-policy'
 
-    (web_api, update, uuid, js) = login_and_check_id(module, name, obj_type, controller_ip, username, password, state, domain=domain, project=project)
+    refs = [("firewall-rule", [domain, project, firewall_rule] if project else ["default-policy-management", firewall_rule]) for firewall_rule in (firewall_rules or [])]
+    (client, update, uuid, js) = login_and_check_id(module, name, obj_type, controller_ip, username, password, state, domain=domain, project=project, refs=refs)
 
     if update and state=='present':
       pass
@@ -154,17 +148,17 @@ def run_module():
     ## begin: object specific
     if (firewall_rules):
       firewall_rule_refs = []
+      if project:
+        firewall_rule_fqnames = [[domain, project, firewall_rule_name] for firewall_rule_name in firewall_rules]
+      else:
+        firewall_rule_fqnames = [["default-policy-management", firewall_rule_name] for firewall_rule_name in firewall_rules]
+      # get uuid of all firewall rules
+      firewall_rule_uuids = client.resolve_many("firewall-rule", firewall_rule_fqnames)
       for i in range(len(firewall_rules)):
-        # get uuid of each firewall rule
-        firewall_rule_name = firewall_rules[i]
-        if project:
-          firewall_rule_fqname = [domain, project, firewall_rule_name]
-        else:
-          firewall_rule_fqname = ["default-policy-management", firewall_rule_name]
-        response = requests.post(config_api_url + 'fqname-to-id', data=json.dumps({"type": "firewall-rule", "fq_name": firewall_rule_fqname}), headers=vnc_api_headers)
-        if not response.status_code == 200:
+        firewall_rule_fqname = firewall_rule_fqnames[i]
+        firewall_rule_uuid = firewall_rule_uuids[i]
+        if firewall_rule_uuid == None:
           module.fail_json(msg="specified firewall-rule doesn't exist", **result)
-        firewall_rule_uuid = json.loads(response.text).get("uuid")
         firewall_rule_refs.append({"attr": {"sequence": "{}".format(i)}, "to": firewall_rule_fqname, "uuid": firewall_rule_uuid})
       js["firewall-policy"]["firewall_rule_refs"] = firewall_rule_refs
     ## end: object specific
@@ -172,7 +166,7 @@ def run_module():
 
     payload=json.dumps(js)
 
-    failed = crud (web_api, controller_ip, update, state, result, payload=payload, obj_type=obj_type, uuid=uuid)
+    failed = crud (client, controller_ip, update, state, result, payload=payload, obj_type=obj_type, uuid=uuid)
 
 
     if failed:
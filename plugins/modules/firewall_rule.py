@@ -27,7 +27,7 @@ options:
         required: true
     controller_ip:
         description:
-            - tungstenfabric controller ip
+            - tungstenfabric controller ip (comma separated list, when there are multiple controllers)
         required: true
     project:
         description:
@@ -80,7 +80,6 @@ message:
 
 import sys
 import json
-import requests
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud
 
@@ -126,12 +125,9 @@ def run_module():
     service = module.params.get("service")
     action_list = module.params.get("action_list")
 
-    if module.check_mode:
-        module.exit_json(**result)
-
     obj_type='firewall-rule'
 
-    (web_api, update, uuid, js) = login_and_check_id(module, name, obj_type, controller_ip, username, password, state, domain=domain, project=project)
+    (client, update, uuid, js) = login_and_check_id(module, name, obj_type, controller_ip, username, password, state, domain=domain, project=project)
 
     if update and state=='present':
       pass
@@ -205,7 +201,7 @@ def run_module():
 
     payload=json.dumps(js)
 
-    failed = crud (web_api, controller_ip, update, state, result, payload=payload, obj_type=obj_type, uuid=uuid)
+    failed = crud (client, controller_ip, update, state, result, payload=payload, obj_type=obj_type, uuid=uuid)
 
 
     if failed:
@@ -23,7 +23,7 @@ description:
 options:
     controller_ip:
         description:
-            - tungstenfabric controller ip
+            - tungstenfabric controller ip (comma separated list, when there are multiple controllers)
         required: true
     autonomous_system:
         description:
@@ -52,7 +52,6 @@ message:
 
 import sys
 import json
-import requests
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud
 
@@ -81,12 +80,9 @@ def run_module():
     state = module.params.get("state")
     autonomous_system = module.params.get("autonomous_system")
 
-    if module.check_mode:
-        module.exit_json(**result)
-
     obj_type='global-system-config'
 
-    (web_api, update, uuid, js) = login_and_check_id(module, name, obj_type, controller_ip, username, password, state)
+    (client, update, uuid, js) = login_and_check_id(module, name, obj_type, controller_ip, username, password, state)
 
     ## begin: object specific
     old_js = js
@@ -108,7 +104,7 @@ def run_module():
     #print (js.get("global-system-config").get("uuid"))
     #sys.exit(35)
 
-    failed = crud (web_api, controller_ip, update, state, result, payload=payload, obj_type=obj_type, uuid=uuid)
+    failed = crud (client, controller_ip, update, state, result, payload=payload, obj_type=obj_type, uuid=uuid)
 
 
     if failed:
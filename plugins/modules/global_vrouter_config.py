@@ -23,7 +23,7 @@ description:
 options:
     controller_ip:
         description:
-            - tungstenfabric controller ip
+            - tungstenfabric controller ip (comma separated list, when there are multiple controllers)
         required: true
     flow_export_rate:
         description:
@@ -55,7 +55,6 @@ message:
 
 import sys
 import json
-import requests
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud
 
@@ -90,12 +89,9 @@ def run_module():
     flow_export_rate = module.params.get("flow_export_rate")
     port_translation_pool = module.params.get("port_translation_pool")
 
-    if module.check_mode:
-        module.exit_json(**result)
-
     obj_type='global-vrouter-config'
 
-    (web_api, update, uuid, js) = login_and_check_id(module, name, obj_type, controller_ip, username, password, state)
+    (client, update, uuid, js) = login_and_check_id(module, name, obj_type, controller_ip, username, password, state)
 
     ## begin: object specific
     if vxlan_network_identifier_mode:
@@ -119,7 +115,7 @@ def run_module():
 
     payload=json.dumps(js)
 
-    failed = crud (web_api, controller_ip, update, state, result, payload=payload, obj_type=obj_type, uuid=uuid)
+    failed = crud (client, controller_ip, update, state, result, payload=payload, obj_type=obj_type, uuid=uuid)
 
 
     if failed:
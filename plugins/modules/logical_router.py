@@ -27,7 +27,7 @@ options:
         required: true
     controller_ip:
         description:
-            - tungstenfabric controller ip
+            - tungstenfabric controller ip (comma separated list, when there are multiple controllers)
         required: true
     domain:
         description:
@@ -91,9 +91,8 @@ message:
 
 import sys
 import json
-import requests
 from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud, vnc_api_headers
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud
 
 
 def run_module():
@@ -135,13 +134,11 @@ def run_module():
     vxlan_network_identifier = module.params.get("vxlan_network_identifier")
     physical_router_refs = module.params.get("physical_router_refs")
 
-    if module.check_mode:
-        module.exit_json(**result)
-
     ## begin: logical-router
     obj_type='logical-router'
 
-    (web_api, update, uuid, js) = login_and_check_id(module, name, obj_type, controller_ip, username, password, state, domain=domain, project=project)
+    refs = [("physical-router", ["default-global-system-config", physical_router]) for physical_router in (physical_router_refs or [])]
+    (client, update, uuid, js) = login_and_check_id(module, name, obj_type, controller_ip, username, password, state, domain=domain, project=project, refs=refs)
 
     ## create payload and call API
     if update and state=='present':
@@ -184,7 +181,7 @@ def run_module():
     ## end: logical-router
     payload=json.dumps(js)
 
-    failed = crud (web_api, controller_ip, update, state, result, payload=payload, obj_type=obj_type, uuid=uuid)
+    failed = crud (client, controller_ip, update, state, result, payload=payload, obj_type=obj_type, uuid=uuid)
 
     if failed:
         module.fail_json(msg='failure message', **result)
@@ -27,7 +27,7 @@ options:
         required: true
     controller_ip:
         description:
-            - tungstenfabric controller ip
+            - tungstenfabric controller ip (comma separated list, when there are multiple controllers)
         required: true
     physical-router:
         description:
@@ -70,9 +70,8 @@ message:
 
 import sys
 import json
-import requests
 from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud, vnc_api_headers
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud, run_in_parallel, object_diff, check_mode_plan
 
 def run_module():
     module_args = dict(
@@ -106,15 +105,13 @@ def run_module():
     physical_router = module.params.get("physical_router")
     share = module.params.get("share")
 
-    if module.check_mode:
-        module.exit_json(**result)
-
     obj_type='physical-interface'
 
-    (web_api, update, uuid, js) = login_and_check_id(module, name, obj_type, controller_ip, username, password, state, domain=domain, project=project, physical_router=physical_router)
+    refs = [("project", [domain, tenant[0]]) for tenant in (share or [])]
+    (client, update, uuid, js) = login_and_check_id(module, name, obj_type, controller_ip, username, password, state, domain=domain, project=project, physical_router=physical_router, config_api_only=True, refs=refs, fields=['perms2'])
+    config_api = client.config_api
 
     ## begin: object specific
-    config_api_url = 'http://' + controller_ip + ':8082/'
 
     failed=False
 
@@ -124,30 +121,35 @@ def run_module():
 
         if not share == None:
           tmp_share_list=[]
-          for tenant_name, tenant_permission in share:
-            response = requests.post(config_api_url + 'fqname-to-id', data='{"type": "project", "fq_name": ["%s", "%s"]}' % (domain, tenant_name), headers=vnc_api_headers)
-            if not response.status_code == 200:
+          project_uuids = run_in_parallel(module, lambda tenant: client.resolve("project", [domain, tenant[0]]), share)
+          for (tenant_name, tenant_permission), project_uuid in zip(share, project_uuids):
+            if project_uuid == None:
               failed = True
-              result["message"] = response.text
               module.fail_json(msg="uuid of specified shared project cannot be obtained", **result)
-            project_uuid = json.loads(response.text).get("uuid")
             tmp_share_list.append({"tenant": project_uuid, "tenant_access": tenant_permission})
           js["physical-interface"]["perms2"]["share"]=tmp_share_list
 
 
-        response = requests.put(config_api_url + 'physical-interface/' + uuid, data=json.dumps(js), headers=vnc_api_headers)
-        if not response.status_code == 200:
-          failed = True
-          result["message"] = response.text
-          module.fail_json(msg="physical-interface update failed", **result)
+        check_mode_plan(client, result, state, update, obj_type, uuid, desired=js)
+        if object_diff('physical-interface', js, client.live) == []:
+          result["message"] = "physical-interface is up to date"
+        else:
+          response = config_api.put('physical-interface/' + uuid, data=json.dumps(js))
+          if not response.status_code == 200:
+            failed = True
+            result["message"] = response.text
+            module.fail_json(msg="physical-interface update failed", **result)
+          result["changed"] = True
 
       elif state == 'absent':
         # delete physical-interface
-        response = requests.delete(config_api_url + 'physical-interface/' + uuid, data=json.dumps(js), headers=vnc_api_headers)
+        check_mode_plan(client, result, state, update, obj_type, uuid)
+        response = config_api.delete('physical-interface/' + uuid, data=json.dumps(js))
         if not response.status_code == 200:
           failed = True
           result["message"] = response.text
           module.fail_json(msg="physical-interface deletion failed", **result)
+        result["changed"] = True
     else:
       if state == 'present':
         js=json.loads (
@@ -160,11 +162,13 @@ def run_module():
         }
         ''' % (physical_router, name)
         )
-        response = requests.post(config_api_url + 'physical-interfaces', data=json.dumps(js), headers=vnc_api_headers)
+        check_mode_plan(client, result, state, update, obj_type, uuid, desired=js)
+        response = config_api.post('physical-interfaces', data=json.dumps(js))
         if not response.status_code == 200:
           failed = True
           result["message"] = response.text
           module.fail_json(msg="physical-interface creation failed", **result)
+        result["changed"] = True
 
       else:
         module.fail_json(msg="physical-interface doesn't exist", **result)
@@ -27,7 +27,7 @@ options:
         required: true
     controller_ip:
         description:
-            - tungstenfabric controller ip
+            - tungstenfabric controller ip (comma separated list, when there are multiple controllers)
         required: true
     domain:
         description:
@@ -94,9 +94,8 @@ message:
 import sys
 import uuid as uuid_module
 import json
-import requests
 from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud, vnc_api_headers
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud
 
 def run_module():
     module_args = dict(
@@ -144,12 +143,9 @@ def run_module():
     right_interface_uuids = module.params.get("right_interface_uuids")
     service_template = module.params.get("service_template")
 
-    if module.check_mode:
-        module.exit_json(**result)
-
     obj_type='service-instance'
 
-    (web_api, update, uuid, js) = login_and_check_id(module, name, obj_type, controller_ip, username, password, state, domain=domain, project=project)
+    (client, update, uuid, js) = login_and_check_id(module, name, obj_type, controller_ip, username, password, state, domain=domain, project=project)
 
 
     if update and state=='present':
@@ -168,7 +164,6 @@ def run_module():
     )
 
     ## begin: object specific
-    config_api_url = 'http://' + controller_ip + ':8082/'
 
     failed=False
     userData={}
@@ -192,37 +187,33 @@ def run_module():
       js["service-instance"]["port_tuples"]=tmp_port_tuples
 
     if update:
-      response = requests.get (config_api_url + 'service-instance/' + uuid, headers=vnc_api_headers)
-      if not response.status_code == 200:
-        failed = True
-        result["message"] = response.text
-        module.fail_json(msg="cannot obtain service-instance object detail", **result)
-      port_tuples = json.loads(response.text).get("service-instance").get("port_tuples")
-
+      # service-instance is already fetched, so get its port-tuples and their vmis: one request for each level
+      port_tuples = js["service-instance"].get("port_tuples") or []
+
+      # list-bulk-collection returns back_refs only when they are given in fields
+      port_tuple_objs = client.get_objects([("port-tuple", port_tuple.get("uuid")) for port_tuple in port_tuples], fields=["virtual_machine_interface_back_refs"])
+      vmi_uuids = []
+      for port_tuple in port_tuples:
+        if not port_tuple.get("uuid") in port_tuple_objs:
+          failed = True
+          module.fail_json(msg="cannot obtain port-tuple object detail", **result)
+        vmi_uuids += [vmi_back_ref.get("uuid") for vmi_back_ref in port_tuple_objs[port_tuple.get("uuid")].get("virtual_machine_interface_back_refs") or []]
+      vmi_objs = client.get_objects([("virtual-machine-interface", vmi_uuid) for vmi_uuid in vmi_uuids])
 
       for i in range(len(port_tuples)):
         # href needs to be removed, to make webui update logic works ..
         del port_tuples[i]["href"]
 
         # get vmi uuids
-        port_tuple_uuid = port_tuples[i].get("uuid")
-        response = requests.get (config_api_url + 'port-tuple/' + port_tuple_uuid, headers=vnc_api_headers)
-        if not response.status_code == 200:
-          failed = True
-          result["message"] = response.text
-          module.fail_json(msg="cannot obtain port-tuple object detail", **result)
-        vmi_back_refs = json.loads(response.text).get("port-tuple").get("virtual_machine_interface_back_refs")
         vmis = []
-        for vmi_back_ref in vmi_back_refs:
+        for vmi_back_ref in port_tuple_objs[port_tuples[i].get("uuid")].get("virtual_machine_interface_back_refs") or []:
           vmi_uuid = vmi_back_ref.get("uuid")
-          response = requests.get (config_api_url + 'virtual-machine-interface/' + vmi_uuid, headers=vnc_api_headers)
-          if not response.status_code == 200:
+          if not vmi_uuid in vmi_objs:
             failed = True
-            result["message"] = response.text
             module.fail_json(msg="cannot obtain vmi object detail", **result)
 
-          vmi_service_interface_type = json.loads(response.text).get("virtual-machine-interface").get("virtual_machine_interface_properties").get("service_interface_type")
-          vmi_fqname = json.loads(response.text).get("virtual-machine-interface").get("fq_name")
+          vmi_service_interface_type = vmi_objs[vmi_uuid].get("virtual_machine_interface_properties").get("service_interface_type")
+          vmi_fqname = vmi_objs[vmi_uuid].get("fq_name")
 
           vmis.append({"uuid": vmi_uuid, "interfaceType": vmi_service_interface_type, "fq_name": vmi_fqname})
         port_tuples[i]["vmis"] = vmis
@@ -237,7 +228,7 @@ def run_module():
 
     payload=json.dumps(js)
 
-    failed = crud (web_api, controller_ip, update, state, result, payload=payload, obj_type=obj_type, uuid=uuid, userData = userData)
+    failed = crud (client, controller_ip, update, state, result, payload=payload, obj_type=obj_type, uuid=uuid, userData = userData)
 
 
     if failed:
@@ -0,0 +1,260 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+ANSIBLE_METADATA = {
+    'metadata_version': '1.1',
+    'status': ['preview'],
+    'supported_by': 'community'
+}
+
+DOCUMENTATION = '''
+---
+module: tf_object_info
+
+short_description: list tungstenfabric config objects page by page
+
+version_added: "2.9"
+
+description:
+    - "list objects of one type with config-api list-bulk-collection (page_limit / page_marker), filtered by parent, back_ref, filters and fields"
+    - "objects are decoded one by one and written to dest (one json object per line), or first max_results objects are returned, so that memory doesn't grow with the number of objects"
+    - "without dest, max_pages and page_marker, objects are counted by config-api (count=True), and only first max_results objects are listed"
+
+options:
+    controller_ip:
+        description:
+            - tungstenfabric controller ip (comma separated list, when there are multiple controllers)
+        required: true
+    type:
+        description:
+            - object type, such as virtual-network, virtual-machine-interface
+        required: true
+    parent_id:
+        description:
+            - list of parent uuids
+        required: false
+    back_ref_id:
+        description:
+            - list of uuids which listed objects refer to
+        required: false
+    obj_uuids:
+        description:
+            - list of uuids to be listed
+        required: false
+    filters:
+        description:
+            - dict of field name and value, to list only the objects which have those values
+        required: false
+    fields:
+        description:
+            - list of fields which are returned with fq_name and uuid
+        required: false
+    detail:
+        description:
+            - return all the fields of the objects
+        required: false
+        default: false
+    page_limit:
+        description:
+            - number of objects in one page
+        required: false
+    page_marker:
+        description:
+            - start listing after this marker (marker which previous task returned)
+        required: false
+    max_pages:
+        description:
+            - stop after this number of pages, and return the marker of the next page (0 for all the pages)
+        required: false
+        default: 0
+    dest:
+        description:
+            - path of the file to write objects to (one json object per line). when this is set, objects are not returned
+        required: false
+    max_results:
+        description:
+            - number of objects which are returned, when dest is not set
+        required: false
+        default: 100
+
+author:
+    - Tatsuya Naganawa (@tnaganawa)
+'''
+
+EXAMPLES = '''
+# Pass in a message
+- name: list vmis of vn1 with their mac addresses
+  tungstenfabric.networking.tf_object_info:
+    controller_ip: x.x.x.x
+    type: virtual-machine-interface
+    back_ref_id:
+      - "{{ vn1_uuid }}"
+    fields:
+      - virtual_machine_interface_mac_addresses
+    dest: /tmp/vn1-vmis.json
+
+- name: list virtual-networks of admin project, whose vni is 5
+  tungstenfabric.networking.tf_object_info:
+    controller_ip: x.x.x.x
+    type: virtual-network
+    parent_id:
+      - "{{ admin_project_uuid }}"
+    filters:
+      virtual_network_network_id: 5
+'''
+
+RETURN = '''
+message:
+    description: The output message that this module generates
+    type: str
+    returned: always
+count:
+    description: number of listed objects (number of matching objects, when it is counted by config-api)
+    type: int
+    returned: always
+objects:
+    description: listed objects (first max_results of them), when dest is not set
+    type: list
+    returned: always
+truncated:
+    description: true when there are more objects than max_results, and they are not returned
+    type: bool
+    returned: always
+output:
+    description: path of the file which objects are written to
+    type: str
+    returned: when dest is set
+marker:
+    description: page_marker of the next page, when max_pages stopped listing (null when all the pages are listed)
+    type: str
+    returned: always
+'''
+
+import os
+import sys
+import json
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.six import string_types
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import TFClient, TFError, BULK_PAGE_LIMIT
+
+def run_module():
+    module_args = dict(
+        controller_ip=dict(type='str', required=True),
+        type=dict(type='str', required=True),
+        parent_id=dict(type='list', required=False),
+        back_ref_id=dict(type='list', required=False),
+        obj_uuids=dict(type='list', required=False),
+        filters=dict(type='dict', required=False),
+        fields=dict(type='list', required=False),
+        detail=dict(type='bool', required=False, default=False),
+        page_limit=dict(type='int', required=False, default=BULK_PAGE_LIMIT),
+        page_marker=dict(type='str', required=False),
+        max_pages=dict(type='int', required=False, default=0),
+        dest=dict(type='str', required=False),
+        max_results=dict(type='int', required=False, default=100)
+    )
+    result = dict(
+        changed=False,
+        message=''
+    )
+
+    module = AnsibleModule(
+        argument_spec=module_args,
+        supports_check_mode=True
+    )
+
+    controller_ip = module.params.get("controller_ip")
+    obj_type = module.params.get("type").replace('_', '-')
+    parent_id = module.params.get("parent_id")
+    back_ref_id = module.params.get("back_ref_id")
+    obj_uuids = module.params.get("obj_uuids")
+    filters = module.params.get("filters")
+    fields = module.params.get("fields")
+    detail = module.params.get("detail")
+    page_limit = module.params.get("page_limit")
+    page_marker = module.params.get("page_marker")
+    max_pages = module.params.get("max_pages")
+    dest = module.params.get("dest")
+    max_results = module.params.get("max_results")
+
+    result["count"] = 0
+    result["objects"] = []
+    result["truncated"] = False
+    result["marker"] = None
+
+    client = TFClient(module, controller_ip)
+    client.keystone_login()
+
+    ## begin: object specific
+    query = {}
+    if parent_id:
+      query["parent_id"] = ",".join(parent_id)
+    if back_ref_id:
+      query["back_ref_id"] = ",".join(back_ref_id)
+    if obj_uuids:
+      query["obj_uuids"] = ",".join(obj_uuids)
+    if filters:
+      query["filters"] = ",".join(["{}=={}".format(k, v if isinstance(v, string_types) else json.dumps(v)) for k, v in filters.items()])
+    if fields:
+      query["fields"] = ",".join(fields)
+    if detail:
+      query["detail"] = True
+    if page_marker:
+      query["page_marker"] = page_marker
+
+    state = {}
+    out = None
+    tmp_dest = None
+    try:
+      if dest:
+        dest = os.path.expanduser(dest)
+        tmp_dest = "{}.{}".format(dest, os.getpid())
+        out = open(tmp_dest, 'w')
+        os.chmod(tmp_dest, 0o600)
+        result["output"] = dest
+        for obj in client.iter_objects(obj_type, page_limit=page_limit, max_pages=max_pages, state=state, **query):
+          result["count"] += 1
+          out.write(json.dumps(obj) + '\n')
+        out.close()
+        os.rename(tmp_dest, dest)
+        tmp_dest = None
+      elif max_pages > 0 or page_marker:
+        # caller is paging: list the requested pages
+        for obj in client.iter_objects(obj_type, page_limit=page_limit, max_pages=max_pages, state=state, **query):
+          result["count"] += 1
+          if len(result["objects"]) < max_results:
+            result["objects"].append(obj)
+        result["truncated"] = result["count"] > len(result["objects"])
+      else:
+        # count, and list only first max_results objects
+        result["count"] = client.count_objects(obj_type, **dict([(k, v) for k, v in query.items() if not k in ['fields', 'detail']]))
+        if max_results > 0:
+          for obj in client.iter_objects(obj_type, page_limit=min(page_limit, max_results), state=state, **query):
+            result["objects"].append(obj)
+            if len(result["objects"]) >= max_results:
+              break
+        result["truncated"] = result["count"] > len(result["objects"])
+      if max_pages > 0:
+        result["marker"] = state["marker"]
+    except TFError as e:
+      result["message"] = e.kwargs.get("message", "")
+      module.fail_json(msg=e.msg, **result)
+    finally:
+      # module.fail_json exits with SystemExit: temporary file is removed in that case too
+      if out:
+        out.close()
+      if tmp_dest and os.path.exists(tmp_dest):
+        os.remove(tmp_dest)
+    ## end: object specific
+
+    result["message"] = "{} {} objects are listed".format(result["count"], obj_type)
+
+    module.exit_json(**result)
+
+def main():
+    run_module()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+ANSIBLE_METADATA = {
+    'metadata_version': '1.1',
+    'status': ['preview'],
+    'supported_by': 'community'
+}
+
+DOCUMENTATION = '''
+---
+module: tf_quota_check
+
+short_description: check that more objects can be created in a project
+
+version_added: "2.9"
+
+description:
+    - "count objects in a project with config-api list-bulk-collection count=True, and compare them with project quota"
+    - "objects themselves are not listed, so it needs a few requests even when the project has many objects"
+    - "instance-ip is counted as the ones which refer to virtual-networks of the project"
+
+options:
+    controller_ip:
+        description:
+            - tungstenfabric controller ip (comma separated list, when there are multiple controllers)
+        required: true
+    domain:
+        description:
+            - domain name
+        required: false
+        default: default-domain
+    project:
+        description:
+            - project name
+        required: true
+    objects:
+        description:
+            - dict of object type and number of objects which will be created, such as virtual-machine-interface: 100
+        required: true
+    fail_on_exceed:
+        description:
+            - fail when some of them exceed the quota
+        required: false
+        default: true
+
+author:
+    - Tatsuya Naganawa (@tnaganawa)
+'''
+
+EXAMPLES = '''
+# Pass in a message
+- name: check that 200 vmis and instance-ips and 2 vns can be created in admin project
+  tungstenfabric.networking.tf_quota_check:
+    controller_ip: x.x.x.x
+    project: admin
+    objects:
+      virtual-network: 2
+      virtual-machine-interface: 200
+      instance-ip: 200
+'''
+
+RETURN = '''
+message:
+    description: The output message that this module generates
+    type: str
+    returned: always
+quota:
+    description: count, quota (null for unlimited), requested, available (null for unlimited) and ok for each type
+    type: dict
+    returned: always
+ok:
+    description: true when all of them can be created
+    type: bool
+    returned: always
+'''
+
+import sys
+import json
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import TFClient, TFError, run_in_parallel, get_parent_type, BULK_RESOLVE_PARENTS
+
+def run_module():
+    module_args = dict(
+        controller_ip=dict(type='str', required=True),
+        domain=dict(type='str', required=False, default='default-domain'),
+        project=dict(type='str', required=True),
+        objects=dict(type='dict', required=True),
+        fail_on_exceed=dict(type='bool', required=False, default=True)
+    )
+    result = dict(
+        changed=False,
+        message=''
+    )
+
+    module = AnsibleModule(
+        argument_spec=module_args,
+        supports_check_mode=True
+    )
+
+    controller_ip = module.params.get("controller_ip")
+    domain = module.params.get("domain")
+    project = module.params.get("project")
+    objects = dict([(obj_type.replace('_', '-'), int(n)) for obj_type, n in module.params.get("objects").items()])
+    fail_on_exceed = module.params.get("fail_on_exceed")
+
+    result["quota"] = {}
+    result["ok"] = True
+
+    for obj_type in objects:
+      if not (obj_type == 'instance-ip' or get_parent_type(obj_type, [domain, project, 'dummy']) == 'project'):
+        module.fail_json(msg="{} cannot be counted in a project".format(obj_type), **result)
+
+    client = TFClient(module, controller_ip)
+    client.keystone_login()
+
+    ## begin: object specific
+    project_uuid = client.resolve('project', [domain, project])
+    if project_uuid == None:
+      module.fail_json(msg="project {}:{} doesn't exist".format(domain, project), **result)
+
+    project_js = client.get_object('project', project_uuid, fields=['quota'])
+    if project_js == None:
+      module.fail_json(msg="cannot obtain project quota", **result)
+    quota = project_js.get('project').get('quota') or {}
+
+    def count(obj_type):
+      if obj_type == 'instance-ip':
+        vn_uuids = [vn.get("uuid") for vn in client.iter_objects('virtual-network', parent_id=project_uuid)]
+        return sum([client.count_objects('instance-ip', back_ref_id=",".join(vn_uuids[i:i + BULK_RESOLVE_PARENTS])) for i in range(0, len(vn_uuids), BULK_RESOLVE_PARENTS)])
+      return client.count_objects(obj_type, parent_id=project_uuid)
+
+    obj_types = sorted(objects)
+    try:
+      counts = run_in_parallel(module, count, obj_types)
+    except TFError as e:
+      result["message"] = e.kwargs.get("message", "")
+      module.fail_json(msg=e.msg, **result)
+
+    exceeded = []
+    for obj_type, n in zip(obj_types, counts):
+      limit = quota.get(obj_type.replace('-', '_'))
+      if limit == None:
+        limit = quota.get('defaults')
+      if limit == None or limit < 0:
+        limit = None
+      available = None if limit == None else max(limit - n, 0)
+      ok = available == None or objects[obj_type] <= available
+      result["quota"][obj_type] = {"count": n, "quota": limit, "requested": objects[obj_type], "available": available, "ok": ok}
+      if not ok:
+        exceeded.append(obj_type)
+    ## end: object specific
+
+    if exceeded:
+      result["ok"] = False
+      result["message"] = "quota exceeded: " + ", ".join(["{} ({} requested, {} available)".format(obj_type, objects[obj_type], result["quota"][obj_type]["available"]) for obj_type in exceeded])
+      if fail_on_exceed:
+        module.fail_json(msg=result["message"], **result)
+    else:
+      result["message"] = "all of them can be created"
+
+    module.exit_json(**result)
+
+def main():
+    run_module()
+
+if __name__ == '__main__':
+    main()
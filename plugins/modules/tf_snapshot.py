@@ -0,0 +1,138 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+ANSIBLE_METADATA = {
+    'metadata_version': '1.1',
+    'status': ['preview'],
+    'supported_by': 'community'
+}
+
+DOCUMENTATION = '''
+---
+module: tf_snapshot
+
+short_description: take a local snapshot of tungstenfabric config objects
+
+version_added: "2.9"
+
+description:
+    - "get all the objects of specified types from config-api (detail=True, with paging), and write them to a local sqlite file"
+    - "fq_name, uuid, parent and ref / back_ref edges are indexed, so that later tasks and tf_uuid lookup can use it without asking config-api"
+
+options:
+    controller_ip:
+        description:
+            - tungstenfabric controller ip (comma separated list, when there are multiple controllers)
+        required: true
+    types:
+        description:
+            - object types to be saved, such as virtual-network, virtual-machine-interface
+        required: true
+    path:
+        description:
+            - path of the snapshot file (default: $TF_SNAPSHOT, or ~/.cache/tungstenfabric-networking/snapshot.db)
+        required: false
+    page_limit:
+        description:
+            - number of objects in one list-bulk-collection request
+        required: false
+
+author:
+    - Tatsuya Naganawa (@tnaganawa)
+'''
+
+EXAMPLES = '''
+# Pass in a message
+- name: take snapshot of networks and their ports
+  tungstenfabric.networking.tf_snapshot:
+    controller_ip: x.x.x.x
+    types:
+      - project
+      - virtual-network
+      - virtual-machine-interface
+    path: /tmp/tf-snapshot.db
+'''
+
+RETURN = '''
+message:
+    description: The output message that this module generates
+    type: str
+    returned: always
+snapshot:
+    description: path of the snapshot file
+    type: str
+    returned: always
+counts:
+    description: number of saved objects for each type
+    type: dict
+    returned: always
+'''
+
+import sys
+import json
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import TFClient, TFError, BULK_PAGE_LIMIT
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.snapshot import SnapshotWriter, get_snapshot_path, HAS_SQLITE3
+
+def run_module():
+    module_args = dict(
+        controller_ip=dict(type='str', required=True),
+        types=dict(type='list', required=True),
+        path=dict(type='str', required=False),
+        page_limit=dict(type='int', required=False, default=BULK_PAGE_LIMIT)
+    )
+    result = dict(
+        changed=False,
+        message=''
+    )
+
+    module = AnsibleModule(
+        argument_spec=module_args,
+        supports_check_mode=True
+    )
+
+    controller_ip = module.params.get("controller_ip")
+    types = module.params.get("types")
+    path = get_snapshot_path(module.params.get("path"))
+    page_limit = module.params.get("page_limit")
+
+    result["snapshot"] = path
+    result["counts"] = {}
+
+    if not HAS_SQLITE3:
+        module.fail_json(msg="sqlite3 is required for tf_snapshot", **result)
+
+    if module.check_mode:
+        result["changed"] = True
+        module.exit_json(**result)
+
+    client = TFClient(module, controller_ip)
+    client.keystone_login()
+
+    ## begin: object specific
+    writer = SnapshotWriter(path, controller_ip)
+    try:
+      for obj_type in types:
+        obj_type = obj_type.replace('_', '-')
+        for objs in client.iter_pages(obj_type, page_limit=page_limit, detail=True):
+          writer.add(obj_type, objs)
+    except TFError as e:
+      writer.abort()
+      result["message"] = e.kwargs.get("message", "")
+      module.fail_json(msg=e.msg, **result)
+    writer.close()
+    ## end: object specific
+
+    result["changed"] = True
+    result["counts"] = writer.counts
+    result["message"] = "{} objects are saved".format(sum(writer.counts.values()))
+
+    module.exit_json(**result)
+
+def main():
+    run_module()
+
+if __name__ == '__main__':
+    main()
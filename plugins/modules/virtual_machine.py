@@ -27,7 +27,7 @@ options:
         required: true
     controller_ip:
         description:
-            - tungstenfabric controller ip
+            - tungstenfabric controller ip (comma separated list, when there are multiple controllers)
         required: true
     domain:
         description:
@@ -73,7 +73,6 @@ message:
 
 import sys
 import json
-import requests
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud
 
@@ -107,13 +106,12 @@ def run_module():
     uuid = module.params.get("uuid")
     domain = module.params.get("domain")
     project = module.params.get("project")
-
-    if module.check_mode:
-        module.exit_json(**result)
+    virtual_machine_interface_refs = module.params.get("virtual_machine_interface_refs")
 
     obj_type='virtual-machine'
 
-    (web_api, update, uuid, js) = login_and_check_id(module, name, obj_type, controller_ip, username, password, state, domain=domain, project=project)
+    refs = [("virtual-machine-interface", vmi_fqname) for vmi_fqname in (virtual_machine_interface_refs or [])]
+    (client, update, uuid, js) = login_and_check_id(module, name, obj_type, controller_ip, username, password, state, domain=domain, project=project, refs=refs)
 
     if update and state=='present':
       pass
@@ -134,16 +132,18 @@ def run_module():
     if virtual_machine_interface_refs:
       # ["default-domain:admin:vmi1"], []]
       vmi_refs_list=[]
-      for vmi_fqname in virtual_machine_interface_refs:
-        vmi_uuid = fqname_to_id (module, vmi_fqname, 'virtual-machine-interface', controller_ip)
+      vmi_uuids = client.resolve_many('virtual-machine-interface', virtual_machine_interface_refs)
+      for vmi_fqname, vmi_uuid in zip(virtual_machine_interface_refs, vmi_uuids):
+        if vmi_uuid == None:
+          module.fail_json(msg="virtual-machine-interface specified doesn't exist", **result)
         vmi_refs_list.append ({"to": vmi_fqname.split(":"), "uuid": vmi_uuid })
-      js ["virtual-machine-interface"]["virtual_machine_interface_refs"]=vmi_refs_list
+      js ["virtual-machine"]["virtual_machine_interface_refs"]=vmi_refs_list
     ## end: object specific
 
 
     payload=json.dumps(js)
 
-    failed = crud (web_api, controller_ip, update, state, result, payload=payload, obj_type=obj_type, uuid=uuid)
+    failed = crud (client, controller_ip, update, state, result, payload=payload, obj_type=obj_type, uuid=uuid)
 
 
     if failed:
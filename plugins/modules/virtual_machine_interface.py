@@ -27,7 +27,7 @@ options:
         required: true
     controller_ip:
         description:
-            - tungstenfabric controller ip
+            - tungstenfabric controller ip (comma separated list, when there are multiple controllers)
         required: true
     domain:
         description:
@@ -75,10 +75,9 @@ message:
 
 import sys
 import json
-import requests
 import uuid as module_uuid
 from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud, fqname_to_id, vnc_api_headers
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud, fqname_to_id
 
 def run_module():
     module_args = dict(
@@ -118,15 +117,11 @@ def run_module():
     allowed_address_pair = module.params.get("allowed_address_pair")
     disable_policy = module.params.get("disable_policy")
 
-    if module.check_mode:
-        module.exit_json(**result)
-
     obj_type='virtual-machine-interface'
 
-    (web_api, update, uuid, js) = login_and_check_id(module, name, obj_type, controller_ip, username, password, state, domain=domain, project=project)
+    (client, update, uuid, js) = login_and_check_id(module, name, obj_type, controller_ip, username, password, state, domain=domain, project=project)
 
 
-    config_api_url = 'http://' + controller_ip + ':8082/'
 
     if update and state == 'present':
       pass
@@ -169,7 +164,7 @@ def run_module():
     payload=json.dumps(js)
 
 
-    failed = crud (web_api, controller_ip, update, state, result, payload=payload, obj_type=obj_type, uuid=uuid)
+    failed = crud (client, controller_ip, update, state, result, payload=payload, obj_type=obj_type, uuid=uuid)
 
 
     if failed:
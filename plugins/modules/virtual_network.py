@@ -27,7 +27,7 @@ options:
         required: true
     controller_ip:
         description:
-            - tungstenfabric controller ip
+            - tungstenfabric controller ip (comma separated list, when there are multiple controllers)
         required: true
     subnet:
         description:
@@ -149,9 +149,8 @@ message:
 import sys
 import uuid as uuid_module
 import json
-import requests
 from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud, vnc_api_headers
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud
 
 def run_module():
     module_args = dict(
@@ -223,15 +222,14 @@ def run_module():
     network_policy_refs = module.params.get("network_policy_refs")
     tag_refs = module.params.get("tag_refs")
 
-    if module.check_mode:
-        module.exit_json(**result)
-
     ## begin: virtual-network
-    config_api_url = 'http://' + controller_ip + ':8082/'
 
     obj_type='virtual-network'
 
-    (web_api, update, uuid, js) = login_and_check_id(module, name, obj_type, controller_ip, username, password, state, domain=domain, project=project)
+    refs = [("network-policy", np_fqname) for np_fqname in (network_policy_refs or [])] + [("tag", tag_fqname) for tag_fqname in (tag_refs or [])]
+    (client, update, uuid, js) = login_and_check_id(module, name, obj_type, controller_ip, username, password, state, domain=domain, project=project, refs=refs,
+      fields=['network_ipam_refs', 'flood_unknown_unicast', 'ip_fabric_forwarding', 'fabric_snat', 'virtual_network_category', 'network_policy_refs', 'tag_refs',
+        'virtual_network_properties', 'route_target_list', 'import_route_target_list', 'export_route_target_list'])
 
     if update and state=='present':
       pass
@@ -269,19 +267,20 @@ def run_module():
     if not network_policy_refs == None:
       # ["default-domain:admin:network-policy1"], []]
       network_policy_refs_list=[]
-      for np_fqname in network_policy_refs:
-        response = requests.post(config_api_url + 'fqname-to-id', data=json.dumps({"type": "network-policy", "fq_name": np_fqname.split(":")}), headers=vnc_api_headers)
-        if not response.status_code == 200:
+      np_uuids = client.resolve_many("network-policy", network_policy_refs)
+      for np_fqname, np_uuid in zip(network_policy_refs, np_uuids):
+        if np_uuid == None:
           module.fail_json(msg="network-policy specified doesn't exist", **result)
-        np_uuid = json.loads(response.text).get("uuid")
         network_policy_refs_list.append ({"to": np_fqname.split(":"), "uuid": np_uuid, "attr": {"sequence": {"major": 0, "minor": 0}}})
       js ["virtual-network"]["network_policy_refs"]=network_policy_refs_list
 
     if not tag_refs == None:
       # ["default-domain:admin:site=A"], []]
       tag_refs_list=[]
-      for tag_fqname in tag_refs:
-        tag_uuid = fqname_to_id (module, tag_fqname, 'tag', controller_ip)
+      tag_uuids = client.resolve_many('tag', tag_refs)
+      for tag_fqname, tag_uuid in zip(tag_refs, tag_uuids):
+        if tag_uuid == None:
+          module.fail_json(msg="tag specified doesn't exist", **result)
         tag_refs_list.append ({"to": tag_fqname.split(":"), "uuid": tag_uuid })
       js ["virtual-network"]["tag_refs"]=tag_refs_list
 
@@ -308,7 +307,7 @@ def run_module():
 
     payload=json.dumps(js)
 
-    failed = crud (web_api, controller_ip, update, state, result, payload=payload, obj_type=obj_type, uuid=uuid)
+    failed = crud (client, controller_ip, update, state, result, payload=payload, obj_type=obj_type, uuid=uuid)
 
     if failed:
         module.fail_json(msg='failure message', **result)
@@ -27,7 +27,7 @@ options:
         required: true
     controller_ip:
         description:
-            - tungstenfabric controller ip
+            - tungstenfabric controller ip (comma separated list, when there are multiple controllers)
         required: true
     domain:
         description:
@@ -87,9 +87,8 @@ message:
 
 import sys
 import json
-import requests
 from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud, vnc_api_headers
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import login_and_check_id, crud, run_in_parallel, object_diff, check_mode_plan, response_json
 
 def run_module():
     module_args = dict(
@@ -125,15 +124,13 @@ def run_module():
     physical_interfaces = module.params.get("physical_interfaces")
     share = module.params.get("share")
 
-    if module.check_mode:
-        module.exit_json(**result)
-
     obj_type='virtual-port-group'
 
-    (web_api, update, uuid, js) = login_and_check_id(module, name, obj_type, controller_ip, username, password, state, domain=domain, project=project, fabric=fabric)
+    refs = [("physical-interface", ["default-global-system-config", device, physical_interface]) for device, physical_interface in (physical_interfaces or [])] + [("project", [domain, tenant[0]]) for tenant in (share or [])]
+    (client, update, uuid, js) = login_and_check_id(module, name, obj_type, controller_ip, username, password, state, domain=domain, project=project, fabric=fabric, config_api_only=True, refs=refs, fields=['physical_interface_refs', 'perms2'])
+    config_api = client.config_api
 
     ## begin: object specific
-    config_api_url = 'http://' + controller_ip + ':8082/'
 
     failed=False
 
@@ -141,15 +138,12 @@ def run_module():
     ## create physical_interface_refs when physical_interface is not empty
     physical_interface_refs=[]
     if state == 'present' and physical_interfaces:
-        for device, physical_interface in physical_interfaces:
-
-          # get uuid of physical-interface
-          response = requests.post(config_api_url + 'fqname-to-id', data='{"type": "physical_interface", "fq_name": ["default-global-system-config", "%s", "%s"]}' % (device, physical_interface), headers=vnc_api_headers)
-          if not response.status_code == 200:
+        # get uuid of all physical-interfaces
+        pi_uuids = client.resolve_many("physical-interface", [["default-global-system-config", device, physical_interface] for device, physical_interface in physical_interfaces])
+        for (device, physical_interface), pi_uuid in zip(physical_interfaces, pi_uuids):
+          if pi_uuid == None:
             failed = True
-            result["message"] = response.text
             module.fail_json(msg="physical-interface doesn't exist", **result)
-          pi_uuid = json.loads(response.text).get("uuid")
 
           physical_interface_refs.append({"uuid": pi_uuid, "to": ["default-global-config", device, physical_interface], "attr": None})
 
@@ -160,31 +154,36 @@ def run_module():
 
         if not share == None:
           tmp_share_list=[]
-          for tenant_name, tenant_permission in share:
-            response = requests.post(config_api_url + 'fqname-to-id', data='{"type": "project", "fq_name": ["%s", "%s"]}' % (domain, tenant_name), headers=vnc_api_headers)
-            if not response.status_code == 200:
+          project_uuids = run_in_parallel(module, lambda tenant: client.resolve("project", [domain, tenant[0]]), share)
+          for (tenant_name, tenant_permission), project_uuid in zip(share, project_uuids):
+            if project_uuid == None:
               failed = True
-              result["message"] = response.text
               module.fail_json(msg="uuid of specified shared project cannot be obtained", **result)
-            project_uuid = json.loads(response.text).get("uuid")
             tmp_share_list.append({"tenant": project_uuid, "tenant_access": tenant_permission})
           js["virtual-port-group"]["perms2"]["share"]=tmp_share_list
 
 
-        response = requests.put(config_api_url + 'virtual-port-group/' + uuid, data=json.dumps(js), headers=vnc_api_headers)
-        if not response.status_code == 200:
-          failed = True
-          result["message"] = response.text
-          module.fail_json(msg="vpg update failed", **result)
+        check_mode_plan(client, result, state, update, obj_type, uuid, desired=js)
+        if object_diff('virtual-port-group', js, client.live) == []:
+          result["message"] = "virtual-port-group is up to date"
+        else:
+          response = config_api.put('virtual-port-group/' + uuid, data=json.dumps(js))
+          if not response.status_code == 200:
+            failed = True
+            result["message"] = response.text
+            module.fail_json(msg="vpg update failed", **result)
+          result["changed"] = True
 
 
       elif state == 'absent':
         # delete virtual-port-group
-        response = requests.delete(config_api_url + 'virtual-port-group/' + uuid, data=json.dumps(js), headers=vnc_api_headers)
+        check_mode_plan(client, result, state, update, obj_type, uuid)
+        response = config_api.delete('virtual-port-group/' + uuid, data=json.dumps(js))
         if not response.status_code == 200:
           failed = True
           result["message"] = response.text
           module.fail_json(msg="vpg deletion failed", **result)
+        result["changed"] = True
     else:
       if state == 'present':
         js=json.loads (
@@ -197,22 +196,24 @@ def run_module():
         }
         ''' % (fabric, name)
         )
-        response = requests.post(config_api_url + 'virtual-port-groups', data=json.dumps(js), headers=vnc_api_headers)
+        check_mode_plan(client, result, state, update, obj_type, uuid, desired={obj_type: dict(js[obj_type], physical_interface_refs=physical_interface_refs)})
+        response = config_api.post('virtual-port-groups', data=json.dumps(js))
         if not response.status_code == 200:
           failed = True
           result["message"] = response.text
           module.fail_json(msg="vpg creation failed", **result)
 
         # add physical-interfaces
-        uuid = json.loads(response.text).get("virtual-port-group").get("uuid")
+        uuid = response_json(response).get("virtual-port-group").get("uuid")
 
         js["virtual-port-group"]["physical_interface_refs"]=physical_interface_refs
 
-        response = requests.put(config_api_url + 'virtual-port-group/' + uuid, data=json.dumps(js), headers=vnc_api_headers)
+        response = config_api.put('virtual-port-group/' + uuid, data=json.dumps(js))
         if not response.status_code == 200:
           failed = True
           result["message"] = response.text
           module.fail_json(msg="physical interface addition failed", **result)
+        result["changed"] = True
 
       else:
         module.fail_json(msg="vpg doesn't exist", **result)
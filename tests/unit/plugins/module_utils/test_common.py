@@ -0,0 +1,93 @@
+# Copyright: (c) 2020, Tatsuya Naganawa <tatsuyan201101@gmail.com>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+import json
+import pytest
+from ansible_collections.tungstenfabric.networking.plugins.module_utils.common import _matches, object_diff, iter_json_items
+
+
+## _matches
+def test_matches_scalar_is_case_sensitive():
+  assert _matches('vn1', 'vn1')
+  assert not _matches('VN1', 'vn1')
+  assert not _matches('ACCESS', 'access')
+
+def test_matches_boolean_folds_case():
+  assert _matches(True, True)
+  assert _matches('True', True)
+  assert _matches('true', True)
+  assert not _matches('true', False)
+
+def test_matches_number_and_text():
+  assert _matches(5, 5)
+  assert _matches('5', 5)
+  assert not _matches(5, 6)
+
+def test_matches_empty_values():
+  assert _matches(None, None)
+  assert _matches('', None)
+  assert _matches([], None)
+  assert _matches({"a": None}, None)
+  assert not _matches('vn1', None)
+  assert not _matches(None, 'vn1')
+
+def test_matches_dict_ignores_extra_live_keys():
+  assert _matches({"a": 1}, {"a": 1, "b": 2})
+  assert not _matches({"a": 1, "b": 3}, {"a": 1, "b": 2})
+  assert not _matches({"a": 1}, [1])
+
+def test_matches_list_is_ordered():
+  assert _matches([1, 2], [1, 2])
+  assert not _matches([1, 2], [2, 1])
+  assert not _matches([1, 2], [1, 2, 3])
+
+def test_matches_refs_are_unordered_and_by_uuid():
+  desired = {"network_policy_refs": [{"to": ["x"], "uuid": "u2"}, {"to": ["default-domain", "admin", "np1"], "uuid": "u1"}]}
+  live = {"network_policy_refs": [{"to": ["default-domain", "admin", "np1"], "uuid": "u1", "href": "h1"}, {"to": ["default-domain", "admin", "np2"], "uuid": "u2", "href": "h2"}]}
+  assert _matches(desired, live)
+  live["network_policy_refs"].pop()
+  assert not _matches(desired, live)
+
+
+## object_diff
+def test_object_diff():
+  desired = {"virtual-network": {"display_name": "vn1", "href": "x", "flood_unknown_unicast": "true", "virtual_network_properties": {"forwarding_mode": "l3"}, "network_ipam_back_refs": [{"uuid": "u"}]}}
+  live = {"virtual-network": {"display_name": "VN1", "flood_unknown_unicast": True, "virtual_network_properties": {"forwarding_mode": "l2_l3", "vxlan_network_identifier": 5}}}
+  assert object_diff("virtual-network", desired, live) == ["display_name", "virtual_network_properties"]
+
+def test_object_diff_unchanged():
+  desired = {"virtual-network": {"display_name": "vn1", "network_policy_refs": [{"to": ["a"], "uuid": "u2"}, {"to": ["b"], "uuid": "u1"}]}}
+  live = {"virtual-network": {"display_name": "vn1", "uuid": "u", "network_policy_refs": [{"to": ["b"], "uuid": "u1"}, {"to": ["a"], "uuid": "u2"}]}}
+  assert object_diff("virtual-network", desired, live) == []
+  assert object_diff("virtual-network", None, live) == []
+
+def test_object_diff_no_live_object():
+  desired = {"virtual-network": {"display_name": "vn1", "is_shared": False}}
+  assert object_diff("virtual-network", desired, None) == ["display_name"]
+
+
+## iter_json_items
+def test_iter_json_items():
+  text = json.dumps({"marker": "m1", "virtual-networks": [{"uuid": "u1", "fq_name": ["a", "b", "c"]}, {"uuid": "u2"}], "count": 2})
+  rest = {}
+  assert list(iter_json_items(text, "virtual-networks", rest)) == [{"uuid": "u1", "fq_name": ["a", "b", "c"]}, {"uuid": "u2"}]
+  assert rest == {"marker": "m1", "count": 2}
+
+def test_iter_json_items_whitespace_and_empty_list():
+  text = ' {\n "virtual-networks" : [ ] ,\n "marker" : null }\n'
+  rest = {}
+  assert list(iter_json_items(text, "virtual-networks", rest)) == []
+  assert rest == {"marker": None}
+
+def test_iter_json_items_missing_key():
+  assert list(iter_json_items('{"other": [1, 2]}', "virtual-networks")) == []
+
+def test_iter_json_items_nested_brackets_in_strings():
+  text = json.dumps({"tags": [{"name": "a]},[b"}, {"name": "\"{"}]})
+  assert [item["name"] for item in iter_json_items(text, "tags")] == ["a]},[b", "\"{"]
+
+def test_iter_json_items_invalid():
+  with pytest.raises(ValueError):
+    list(iter_json_items('[1, 2]', "virtual-networks"))
+  with pytest.raises(ValueError):
+    list(iter_json_items('{"virtual-networks": [1, 2', "virtual-networks"))